@@ -4,4 +4,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
+# /events/ (Server-Sent Events) uzun süre açık kalan bağlantılar kullanır;
+# bu uygulama bir ASGI sunucusuyla çalıştırılmalı (ör. uvicorn core.asgi:application)
+# ve REALTIME_ENABLED=True ayarlanmalıdır. WSGI altında /events/ kapalıdır.
 application = get_asgi_application()
+
+# Arama önerisi indeksi ilk istek beklemeden arka planda kurulmaya başlar
+from core.suggest import start_suggest_index  # noqa: E402
+start_suggest_index()
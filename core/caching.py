@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+# Upstream hata verip boş sonuç döndüğünde tekrar denemeden önce beklenecek süre (sn)
+EMPTY_RETRY_SECONDS = 60
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Aynı anahtar için eşzamanlı çağrıları birleştirir: ilk çağrı işi yapar,
+    diğerleri onun sonucunu (veya hatasını) bekler.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.executed = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.executed += 1
+            call.event.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'in_flight': len(self._calls)}
+
+
+_showcase_flight = SingleFlight()
+
+
+def _store(key, value, ttl, stale_ttl, previous=None):
+    # Boş sonuç (upstream hatası) elimizdeki dolu veriyi ezmez
+    if not value and previous is not None and previous['value']:
+        value = previous['value']
+        ttl = EMPTY_RETRY_SECONDS
+    elif not value:
+        ttl = EMPTY_RETRY_SECONDS
+    cache.set(key, {'value': value, 'fresh_until': time.time() + ttl}, ttl + stale_ttl)
+    return value
+
+
+def _refresh_in_background(key, fetch, ttl, stale_ttl, previous):
+    # Aynı anahtar için (workerlar arası da) tek bir yenileme çalışır
+    if not cache.add(f"{key}:refreshing", 1, timeout=ttl):
+        return
+
+    def run():
+        try:
+            _store(key, fetch(), ttl, stale_ttl, previous)
+        except Exception:
+            logger.exception("Önbellek yenileme hatası (%s)", key)
+        finally:
+            cache.delete(f"{key}:refreshing")
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def get_or_refresh(key, fetch, ttl=None, stale_ttl=None):
+    """
+    Stale-while-revalidate önbellek: süresi dolmuş değer hemen döner ve
+    arka planda yenilenir. Hiç değer yoksa aynı anahtar için tek bir
+    çağrı fetch() eder, diğerleri onun sonucunu bekler.
+    """
+    ttl = getattr(settings, 'SHOWCASE_TTL', 600) if ttl is None else ttl
+    stale_ttl = getattr(settings, 'SHOWCASE_STALE_TTL', 86400) if stale_ttl is None else stale_ttl
+
+    entry = cache.get(key)
+    if entry is not None:
+        if entry['fresh_until'] <= time.time():
+            _refresh_in_background(key, fetch, ttl, stale_ttl, entry)
+        return entry['value']
+
+    def load():
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+        return _store(key, fetch(), ttl, stale_ttl)
+
+    return _showcase_flight.do(key, load)
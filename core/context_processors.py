@@ -1,9 +1,16 @@
-from .models import Notification
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .notifications import unread_count, unread_latest
 
 def notifications(request):
+    # Sadece şablon kullanırsa önbellekten okunur (bkz. core/notifications.py)
     if request.user.is_authenticated:
+        user = request.user
         return {
-            'notifications': request.user.notifications.filter(is_read=False).order_by('-created_at')[:5],
-            'unread_notification_count': request.user.notifications.filter(is_read=False).count()
+            'notifications': SimpleLazyObject(lambda: unread_latest(user)),
+            'unread_notification_count': SimpleLazyObject(lambda: unread_count(user)),
+            # Anlık olaylar (EventSource) sadece ASGI ile servis ediliyorsa açılır
+            'realtime_enabled': getattr(settings, 'REALTIME_ENABLED', False)
         }
     return {}
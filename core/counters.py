@@ -0,0 +1,43 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Activity, ActivityComment, ActivityLike
+
+COUNTER_FIELDS = ('like_count', 'comment_count', 'share_count')
+
+
+def _count(queryset, field):
+    # Aktivite başına gerçek sayı (GROUP BY yerine satır başına alt sorgu)
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        total=Count('*')
+    ).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def actual_counts():
+    # Sayaç alanı -> tablolardan hesaplanan gerçek değer ifadesi
+    return {
+        'like_count': _count(ActivityLike.objects.all(), 'activity'),
+        'comment_count': _count(ActivityComment.objects.all(), 'activity'),
+        'share_count': _count(Activity.objects.filter(action_type='SHARED'), 'original_activity'),
+    }
+
+
+def adjust_counter(activity_id, field, delta):
+    # Yarış koşuluna karşı veritabanında atomik artırma/azaltma
+    queryset = Activity.objects.filter(pk=activity_id)
+    if delta < 0:
+        queryset = queryset.filter(**{f"{field}__gte": -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def reconcile_counters(queryset):
+    """
+    Verilen aktivitelerden sayaçları gerçek değerden sapmış olanları
+    toplu olarak düzeltir, düzeltilen satır sayısını döner.
+    """
+    actual = actual_counts()
+    drifted = queryset.annotate(**{f"actual_{field}": expression for field, expression in actual.items()}).exclude(
+        **{field: F(f"actual_{field}") for field in COUNTER_FIELDS}
+    ).values_list('pk', flat=True)
+    return Activity.objects.filter(pk__in=list(drifted)).update(**actual)
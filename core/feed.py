@@ -0,0 +1,247 @@
+import base64
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, DateTimeField, Case, Exists, F, OuterRef, Prefetch, Q, Value, When, prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_datetime
+from django.utils.safestring import mark_safe
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+from .models import Activity, ActivityComment, ActivityLike
+
+FEED_PAGE_SIZE = 10
+FEED_SINCE_LIMIT = 50
+
+# activity_card.html'in eriştiği tüm ilişkiler (kart başına ek sorgu olmasın)
+FEED_SELECT_RELATED = (
+    'user', 'user__profile', 'movie', 'book',
+    'related_rating', 'related_review', 'related_list', 'related_comment',
+    'original_activity', 'original_activity__user', 'original_activity__user__profile',
+    'original_activity__movie', 'original_activity__book',
+    'original_activity__related_rating', 'original_activity__related_review',
+)
+
+
+def comments_prefetch():
+    return Prefetch(
+        'comments',
+        queryset=ActivityComment.objects.select_related('user', 'user__profile').order_by('created_at'),
+        to_attr='comment_list',
+    )
+
+
+def _shared_by(user, target):
+    return Exists(Activity.objects.filter(user=user, action_type='SHARED', original_activity_id=OuterRef(target)))
+
+
+def feed_queryset(queryset, user):
+    """
+    Akış kartları için aktivite sorgusu: kullanıcının beğenip paylaştığı
+    bilgisi alt sorgu olarak eklenir (sayaçlar Activity üzerinde tutulur).
+    Yorumlar sadece önbellekte olmayan kartlar için yüklenir
+    (attach_card_fragments). Sayfa başına sabit sorgu sayısı.
+    """
+    queryset = queryset.select_related(*FEED_SELECT_RELATED)
+
+    if not user.is_authenticated:
+        return queryset.annotate(
+            is_liked=Value(False, output_field=BooleanField()),
+            is_shared=Value(False, output_field=BooleanField()),
+        )
+
+    # Paylaşım kartında "paylaşıldı mı" kontrolü orijinal aktivite üzerinden yapılır
+    return queryset.annotate(
+        is_liked=Exists(ActivityLike.objects.filter(activity=OuterRef('pk'), user=user)),
+        is_shared=Case(
+            When(action_type='SHARED', then=_shared_by(user, 'original_activity_id')),
+            default=_shared_by(user, 'pk'),
+            output_field=BooleanField(),
+        ),
+    )
+
+
+# --- Kart parçaları önbelleği ---
+# Kartın gövdesi ve yorum listesi izleyiciden bağımsızdır; tüm kullanıcılar
+# için (aktivite id, sürüm) anahtarıyla önbellekte tutulur. Beğeni/paylaşım
+# durumu ve sayaçlar her istekte sorgudan gelen küçük katmanda (activity_card.html)
+# render edilir. Sürüm; yorum, inceleme veya puan değiştiğinde artırılır.
+
+CARD_VERSION_KEY = 'feed:card_version:{}'
+CARD_FRAGMENT_KEY = 'feed:card:{}:{}'
+
+
+def _initial_version():
+    # Sürüm anahtarı önbellekten düşerse eski parçalarla çakışmasın diye
+    # sıfırdan değil zaman damgasından başlanır
+    return time.time_ns()
+
+
+def bump_card_versions(activity_ids):
+    for activity_id in set(activity_ids):
+        key = CARD_VERSION_KEY.format(activity_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), None)
+
+
+def _card_versions(activity_ids):
+    keys = {CARD_VERSION_KEY.format(activity_id): activity_id for activity_id in activity_ids}
+    versions = cache.get_many(keys)
+    missing = {key: _initial_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def attach_card_fragments(activities):
+    """
+    Kartların gövde ve yorum parçalarını önbellekten (tek get_many) alır,
+    eksik olanları render edip geri yazar. Sonuç activity.card_body ve
+    activity.card_comments olarak kartlara eklenir.
+    """
+    activities = list(activities)
+    versions = _card_versions([activity.id for activity in activities])
+    keys = {activity.id: CARD_FRAGMENT_KEY.format(activity.id, versions[activity.id]) for activity in activities}
+    cached = cache.get_many(list(keys.values()))
+
+    # Yorumlar sadece önbellekte olmayan kartlar için tek sorguda yüklenir
+    misses = [activity for activity in activities if keys[activity.id] not in cached]
+    prefetch_related_objects(misses, comments_prefetch())
+
+    rendered = {}
+    for activity in misses:
+        context = {'activity': activity}
+        rendered[keys[activity.id]] = (
+            render_to_string('partials/activity_card_body.html', context),
+            render_to_string('partials/activity_card_comments.html', context),
+        )
+    if rendered:
+        # Gövdedeki "... önce" ifadeleri de en fazla bu süre kadar eskir
+        cache.set_many(rendered, getattr(settings, 'FEED_CARD_CACHE_TTL', 300))
+    cached.update(rendered)
+
+    for activity in activities:
+        body, comments = cached[keys[activity.id]]
+        activity.card_body = mark_safe(body)
+        activity.card_comments = mark_safe(comments)
+    return activities
+
+
+# --- İmleç (keyset) sayfalama ---
+
+def encode_cursor(value, pk):
+    # İstemci için opak imleç: son kaydın (sıralama değeri, id) çifti.
+    # Sıralama değeri tarih (akış) veya sayı (ör. listelerde beğeni sayısı) olabilir
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    raw = json.dumps([value, pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field=None):
+    # Geçersiz imleç ilk sayfa gibi davranır. `field` verilirse değerin tipi
+    # sıralama alanıyla uyuşmalıdır (tarih alanına sayı, sayıya metin gelmez)
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded))
+        expects_datetime = isinstance(field, DateTimeField) if field is not None else isinstance(value, str)
+        if expects_datetime:
+            value = parse_datetime(value) if isinstance(value, str) else None
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            value = None
+        if value is None or isinstance(pk, bool) or not isinstance(pk, int):
+            return None
+        return value, pk
+    except (TypeError, ValueError):
+        return None
+
+
+def _sort_field(model, path):
+    # 'timeline_entries__created_at' gibi ilişki üzerinden gelen sıralama alanı
+    opts, field = model._meta, None
+    for part in path.split('__'):
+        field = opts.get_field(part)
+        if field.is_relation:
+            opts = field.related_model._meta
+    return field
+
+
+def _cursor_fields(queryset):
+    # İmleç (değer, id) çiftidir; sorgu tam olarak iki alanla sıralanmış olmalı
+    order_by = queryset.query.order_by
+    if len(order_by) != 2:
+        raise ValueError(
+            f"İmleç sayfalama iki sıralama alanı bekler (ör. '-created_at', '-id'), verilen: {list(order_by)}"
+        )
+    return tuple(field.lstrip('-') for field in order_by)
+
+
+def paginate_by_cursor(queryset, cursor=None, page_size=FEED_PAGE_SIZE):
+    """
+    (sıralama değeri, id) üzerinde keyset sayfalama. COUNT(*) ve OFFSET yok;
+    her sayfa indekste son görülen konumdan başlar, derin kaydırma ilk
+    sayfa kadar ucuzdur. Sorgu iki alanla azalan sıralanmış olmalıdır
+    (ör. '-created_at', '-id'). (sayfa, sonraki_imleç) döner.
+    """
+    value_field, id_field = _cursor_fields(queryset)
+    # Sıralama alanları ilişki üzerinden (zaman tüneli) olabileceği için
+    # filtre aynı JOIN'i kullanan annotation'lar üzerinden yapılır
+    queryset = queryset.annotate(cursor_value=F(value_field), cursor_id=F(id_field))
+
+    position = decode_cursor(cursor, _sort_field(queryset.model, value_field)) if cursor else None
+    if position:
+        value, pk = position
+        queryset = queryset.filter(
+            Q(cursor_value__lt=value) | Q(cursor_value=value, cursor_id__lt=pk)
+        )
+
+    items = list(queryset[:page_size + 1])
+    if len(items) <= page_size:
+        return items, None
+    items = items[:page_size]
+    last = items[-1]
+    return items, encode_cursor(last.cursor_value, last.cursor_id)
+
+
+def newer_than_cursor(queryset, cursor, limit=FEED_SINCE_LIMIT):
+    """
+    İmleçten (istemcinin gördüğü en yeni kart) daha yeni aktiviteler.
+    (sonuçlar, toplam_yeni_sayısı, yeni_imleç) döner; sonuçlar en yeniden
+    eskiye sıralıdır, toplam limitten büyükse istemci akışı baştan yükler.
+    İmleç yoksa sadece güncel en yeni imleç döner.
+    """
+    value_field, id_field = _cursor_fields(queryset)
+    queryset = queryset.annotate(cursor_value=F(value_field), cursor_id=F(id_field))
+
+    position = decode_cursor(cursor, _sort_field(queryset.model, value_field)) if cursor else None
+    if not position:
+        newest = queryset.first()
+        return [], 0, encode_cursor(newest.cursor_value, newest.cursor_id) if newest else None
+
+    value, pk = position
+    newer = queryset.filter(
+        Q(cursor_value__gt=value) | Q(cursor_value=value, cursor_id__gt=pk)
+    )
+    items = list(newer[:limit])
+    if not items:
+        return [], 0, cursor
+    count = len(items) if len(items) < limit else newer.count()
+    return items, count, encode_cursor(items[0].cursor_value, items[0].cursor_id)
+
+
+class FeedCursorPagination(BasePagination):
+    # API akışı için aynı imleç yapısı: {"results": [...], "next_cursor": "..."}
+    page_size = FEED_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page, self.next_cursor = paginate_by_cursor(queryset, request.query_params.get('cursor'), self.page_size)
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({'results': data, 'next_cursor': self.next_cursor})
@@ -0,0 +1,51 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import UserList
+
+LIST_PREVIEW_SIZE = 5
+LISTS_PAGE_SIZE = 12
+
+
+def list_preview_images(user_list):
+    # Önce filmler, sonra diziler, sonra kitaplar; kapağı olmayanlar atlanır
+    images = [
+        f"https://image.tmdb.org/t/p/w154{poster}"
+        for poster in user_list.movies.exclude(poster_path='').values_list('poster_path', flat=True)[:LIST_PREVIEW_SIZE]
+    ]
+    if len(images) < LIST_PREVIEW_SIZE:
+        images += [
+            f"https://image.tmdb.org/t/p/w154{poster}"
+            for poster in user_list.tv_series.exclude(poster_path='').values_list('poster_path', flat=True)[:LIST_PREVIEW_SIZE - len(images)]
+        ]
+    if len(images) < LIST_PREVIEW_SIZE:
+        images += list(
+            user_list.books.exclude(cover_path='').values_list('cover_path', flat=True)[:LIST_PREVIEW_SIZE - len(images)]
+        )
+    return images
+
+
+def refresh_list_previews(list_ids):
+    # Liste içeriği değiştiğinde (sadece yazma sırasında) kapaklar yeniden seçilir
+    for user_list in UserList.objects.filter(pk__in=list_ids).only('pk'):
+        UserList.objects.filter(pk=user_list.pk).update(preview_images=list_preview_images(user_list))
+
+
+def refresh_like_counts(list_ids):
+    # Artırma/azaltma yerine gerçek sayı yazılır; clear() ve tekrar eden istekler de doğru kalır
+    likes = UserList.likes.through.objects.filter(userlist=OuterRef('pk')).order_by().values('userlist').annotate(
+        total=Count('*')
+    ).values('total')
+    UserList.objects.filter(pk__in=list_ids).update(
+        like_count=Coalesce(Subquery(likes, output_field=IntegerField()), 0)
+    )
+
+
+def liked_list_ids(user, lists):
+    # İzleyicinin sayfadaki listelerden beğendikleri tek sorguda
+    if not user.is_authenticated:
+        return set()
+    return set(
+        UserList.likes.through.objects.filter(user=user, userlist_id__in=[user_list.id for user_list in lists])
+        .values_list('userlist_id', flat=True)
+    )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.notifications import archive_read_notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Saklama süresini aşan okunmuş bildirimleri parça parça arşiv tablosuna "
+        "(NotificationArchive) taşır. Cron ile düzenli çalıştırılmalıdır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'NOTIFICATION_RETENTION_DAYS', 90),
+            help="Bu günden eski okunmuş bildirimler arşivlenir"
+        )
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Tek transaction'da taşınan satır sayısı")
+
+    def handle(self, *args, **options):
+        total = archive_read_notifications(options['days'], options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Tamamlandı: {total} bildirim arşivlendi"))
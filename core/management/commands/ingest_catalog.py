@@ -0,0 +1,225 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Movie, TVSeries, Book
+from core.services import (
+    iter_tmdb_pages, iter_google_books_pages, get_movie_genres, get_tv_genres
+)
+
+# Kaynak adı -> (içerik tipi, TMDB yolu)
+TMDB_SOURCES = {
+    'movie_popular': ('movie', 'movie/popular'),
+    'movie_top_rated': ('movie', 'movie/top_rated'),
+    'movie_genre': ('movie', 'discover/movie'),
+    'tv_popular': ('tv', 'tv/popular'),
+    'tv_top_rated': ('tv', 'tv/top_rated'),
+    'tv_genre': ('tv', 'discover/tv'),
+}
+
+# İçerik tipi -> (model, benzersiz alan, güncellenecek alanlar)
+UPSERT_CONFIG = {
+    'movie': (Movie, 'tmdb_id', ['title', 'overview', 'poster_path', 'release_date', 'vote_average']),
+    'tv': (TVSeries, 'tmdb_id', ['title', 'overview', 'poster_path', 'first_air_date', 'vote_average']),
+    'book': (Book, 'google_id', ['title', 'authors', 'description', 'cover_path', 'page_count']),
+}
+
+
+def _parse_date(value):
+    # Sadece YYYY-MM-DD kabul edilir, yıl tek başına gelirse yılbaşı sayılır
+    if not value:
+        return None
+    if len(value) == 4:
+        return f"{value}-01-01"
+    return value if len(value) == 10 else None
+
+
+def build_movie(item):
+    if not item.get('id') or not item.get('title'):
+        return None
+    return Movie(
+        tmdb_id=item['id'],
+        title=item['title'][:255],
+        overview=item.get('overview') or '',
+        poster_path=item.get('poster_path') or '',
+        release_date=_parse_date(item.get('release_date')),
+        vote_average=item.get('vote_average') or 0,
+    )
+
+
+def build_tv(item):
+    if not item.get('id') or not item.get('name'):
+        return None
+    return TVSeries(
+        tmdb_id=item['id'],
+        title=item['name'][:255],
+        overview=item.get('overview') or '',
+        poster_path=item.get('poster_path') or '',
+        first_air_date=_parse_date(item.get('first_air_date')),
+        vote_average=item.get('vote_average') or 0,
+    )
+
+
+def build_book(item):
+    google_id = item.get('id')
+    info = item.get('volumeInfo', {})
+    if not google_id or not info.get('title'):
+        return None
+    return Book(
+        google_id=google_id,
+        title=info['title'][:500],
+        authors=", ".join(info.get('authors', [])) if info.get('authors') else "Yazar Bilinmiyor",
+        description=info.get('description') or '',
+        cover_path=f"https://books.google.com/books/content?id={google_id}&printsec=frontcover&img=1&zoom=1&h=1000&source=gbs_api",
+        page_count=info.get('pageCount') or 0,
+    )
+
+
+BUILDERS = {'movie': build_movie, 'tv': build_tv, 'book': build_book}
+
+
+class Command(BaseCommand):
+    help = (
+        "TMDB / Google Books listelerini veya yerel bir JSONL dökümünü Movie, TVSeries "
+        "ve Book tablolarına toplu olarak aktarır (upsert). Kaldığı yerden devam edebilir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=list(TMDB_SOURCES) + ['book_subject', 'jsonl'], required=True)
+        parser.add_argument('--genre', action='append', default=[], help="movie_genre/tv_genre için tür ID'si (verilmezse tüm türler)")
+        parser.add_argument('--subject', action='append', default=[], help="book_subject için konu (ör. fiction)")
+        parser.add_argument('--file', help="jsonl kaynağı için dosya yolu (her satır bir TMDB/Google Books kaydı)")
+        parser.add_argument('--type', choices=list(BUILDERS), help="jsonl kaynağındaki içerik tipi")
+        parser.add_argument('--max-pages', type=int, default=500, help="TMDB için kaynak başına en fazla sayfa")
+        parser.add_argument('--max-books', type=int, default=1000, help="Google Books için konu başına en fazla kayıt")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--checkpoint', default='ingest_checkpoint.json', help="Devam noktalarının tutulduğu dosya")
+        parser.add_argument('--reset', action='store_true', help="Kayıtlı devam noktalarını yok say")
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.checkpoint_path = options['checkpoint']
+        self.checkpoints = {} if options['reset'] else self._load_checkpoints()
+        self.total = 0
+        self.started = time.monotonic()
+
+        source = options['source']
+        if source == 'jsonl':
+            if not options['file'] or not options['type']:
+                raise CommandError("jsonl kaynağı için --file ve --type gerekli.")
+            self._ingest_jsonl(options['file'], options['type'])
+        elif source == 'book_subject':
+            for subject in options['subject'] or ['fiction']:
+                self._ingest_books(subject, options['max_books'])
+        else:
+            content_type, path = TMDB_SOURCES[source]
+            if source.endswith('_genre'):
+                genre_ids = options['genre'] or [
+                    str(g['id']) for g in (get_movie_genres() if content_type == 'movie' else get_tv_genres())
+                ]
+                for genre_id in genre_ids:
+                    extra = {'with_genres': genre_id, 'sort_by': 'popularity.desc'}
+                    self._ingest_tmdb(f"{source}:{genre_id}", content_type, path, extra, options['max_pages'])
+            else:
+                self._ingest_tmdb(source, content_type, path, None, options['max_pages'])
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f"Tamamlandı: {self.total} kayıt, {elapsed:.1f} sn ({self._rate():.0f} kayıt/sn)"
+        ))
+
+    # --- Kaynaklar ---
+
+    def _ingest_tmdb(self, key, content_type, path, extra_params, max_pages):
+        next_page = self.checkpoints.get(key, 1)
+        buffer = []
+        for page, results in iter_tmdb_pages(path, extra_params, start_page=next_page, max_pages=max_pages):
+            buffer.extend(results)
+            next_page = page + 1
+            if len(buffer) >= self.batch_size:
+                self._flush(content_type, buffer)
+                buffer = []
+                self._save_checkpoint(key, next_page)
+        self._flush(content_type, buffer)
+        self._save_checkpoint(key, next_page)
+
+    def _ingest_books(self, subject, max_books):
+        key = f"book_subject:{subject}"
+        next_index = self.checkpoints.get(key, 0)
+        buffer = []
+        for start, items in iter_google_books_pages(f"subject:{subject}", start_index=next_index, max_items=max_books):
+            buffer.extend(items)
+            next_index = start + len(items)
+            if len(buffer) >= self.batch_size:
+                self._flush('book', buffer)
+                buffer = []
+                self._save_checkpoint(key, next_index)
+        self._flush('book', buffer)
+        self._save_checkpoint(key, next_index)
+
+    def _ingest_jsonl(self, path, content_type):
+        key = f"jsonl:{os.path.abspath(path)}"
+        start_line = self.checkpoints.get(key, 0)
+        buffer = []
+        line_no = 0
+        with open(path, encoding='utf-8') as f:
+            for line_no, line in enumerate(f, start=1):
+                if line_no <= start_line or not line.strip():
+                    continue
+                try:
+                    buffer.append(json.loads(line))
+                except json.JSONDecodeError:
+                    self.stderr.write(f"Satır {line_no} okunamadı, atlandı.")
+                    continue
+                if len(buffer) >= self.batch_size:
+                    self._flush(content_type, buffer)
+                    buffer = []
+                    self._save_checkpoint(key, line_no)
+        self._flush(content_type, buffer)
+        self._save_checkpoint(key, max(line_no, start_line))
+
+    # --- Yazma ---
+
+    def _flush(self, content_type, items):
+        model, unique_field, update_fields = UPSERT_CONFIG[content_type]
+        build = BUILDERS[content_type]
+
+        # Aynı partide tekrar eden kayıtlar ON CONFLICT'te hata verdiği için tekilleştir
+        objects = {}
+        for item in items:
+            obj = build(item)
+            if obj is not None:
+                objects[getattr(obj, unique_field)] = obj
+        if not objects:
+            return
+
+        model.objects.bulk_create(
+            list(objects.values()),
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=[unique_field],
+            update_fields=update_fields,
+        )
+        self.total += len(objects)
+        self.stdout.write(f"{model.__name__}: {self.total} kayıt ({self._rate():.0f} kayıt/sn)")
+
+    def _rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.total / elapsed if elapsed > 0 else 0
+
+    # --- Devam noktası (checkpoint) ---
+
+    def _load_checkpoints(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_checkpoint(self, key, position):
+        self.checkpoints[key] = position
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoints, f)
+        os.replace(tmp_path, self.checkpoint_path)
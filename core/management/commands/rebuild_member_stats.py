@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core.members import refresh_member_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Üyeler sayfasındaki kullanıcı özetlerini (MemberStats) aktivitelerden yeniden "
+        "hesaplar. Signal'lerle tutulan değerlerdeki sapmaları düzeltmek için düzenli çalıştırılabilir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help="Sadece bu kullanıcı")
+
+    def handle(self, *args, **options):
+        users = User.objects.all()
+        if options['username']:
+            users = users.filter(username=options['username'])
+
+        total = 0
+        for user_id in users.values_list('pk', flat=True).iterator(chunk_size=1000):
+            refresh_member_stats([user_id])
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Tamamlandı: {total} kullanıcının özeti yenilendi"))
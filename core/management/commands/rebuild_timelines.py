@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Profile, TimelineEntry
+from core.timeline import backfill_timeline
+
+
+class Command(BaseCommand):
+    help = "Mevcut takip ilişkilerinden materyalize zaman tünellerini (TimelineEntry) yeniden oluşturur."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clear', action='store_true', help="Önce tüm zaman tüneli kayıtlarını sil")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            TimelineEntry.objects.all().delete()
+
+        follows = Profile.following.through.objects.values_list('from_profile__user_id', 'to_profile__user_id')
+        count = 0
+        for owner_id, followed_id in follows.iterator(chunk_size=2000):
+            backfill_timeline(owner_id, followed_id)
+            count += 1
+            if count % 1000 == 0:
+                self.stdout.write(f"{count} takip ilişkisi işlendi")
+
+        self.stdout.write(self.style.SUCCESS(f"Tamamlandı: {count} takip ilişkisi"))
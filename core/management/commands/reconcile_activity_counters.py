@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from core.counters import reconcile_counters
+from core.models import Activity
+
+
+class Command(BaseCommand):
+    help = (
+        "Activity üzerindeki like_count, comment_count ve share_count sayaçlarını "
+        "gerçek beğeni/yorum/paylaşım sayılarıyla karşılaştırır, sapanları toplu düzeltir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help="Tek seferde kontrol edilen aktivite aralığı")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        max_id = Activity.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+        # Uzun kilitlerden kaçınmak için id aralıkları halinde
+        fixed = 0
+        for start in range(0, max_id + 1, chunk_size):
+            fixed += reconcile_counters(Activity.objects.filter(id__gte=start, id__lt=start + chunk_size))
+
+        self.stdout.write(self.style.SUCCESS(f"Tamamlandı: {fixed} aktivitenin sayacı düzeltildi"))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.rankings import RANKED_MODELS, refresh_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        "En çok beğenilen film/dizi/kitap sıralamalarını (genel ve tür bazında) "
+        "Bayes ortalamasıyla yeniden hesaplar. Cron ile düzenli çalıştırılmalıdır."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--type', choices=list(RANKED_MODELS), help="Sadece bu içerik tipi")
+        parser.add_argument('--full', action='store_true', help="Artımlı yerine tam yenileme")
+
+    def handle(self, *args, **options):
+        content_types = [options['type']] if options['type'] else list(RANKED_MODELS)
+        for content_type in content_types:
+            refresh_rankings(content_type, full=options['full'])
+            self.stdout.write(f"{content_type}: sıralama yenilendi")
+        self.stdout.write(self.style.SUCCESS("Tamamlandı"))
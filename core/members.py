@@ -0,0 +1,150 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from .feed import feed_queryset
+from .models import Activity, MemberStats
+
+MEMBER_RECENT_ITEMS = 4
+# Son içerikler seçilirken taranan en fazla aktivite (aynı içerik tekrar edebilir)
+RECENT_SCAN_LIMIT = 50
+POPULAR_CACHE_KEY = 'members:popular:{}'
+
+
+def recent_item(activity):
+    # Üye kartındaki küçük kapak önizlemesi; film veya kitap yoksa None
+    if activity.movie_id:
+        return {
+            'key': f"movie_{activity.movie_id}",
+            'type': 'movie',
+            'image': f"https://image.tmdb.org/t/p/w92{activity.movie.poster_path}",
+            'title': activity.movie.title,
+        }
+    if activity.book_id:
+        return {
+            'key': f"book_{activity.book_id}",
+            'type': 'book',
+            'image': activity.book.cover_path,
+            'title': activity.book.title,
+        }
+    return None
+
+
+def _merge_recent(items, new_items):
+    # Aynı içerik bir kez, en yeni önce
+    merged, seen = [], set()
+    for item in [*new_items, *items]:
+        if item['key'] not in seen:
+            seen.add(item['key'])
+            merged.append(item)
+    return merged[:MEMBER_RECENT_ITEMS]
+
+
+def _recent_items(user_id):
+    activities = Activity.objects.filter(user_id=user_id).filter(
+        Q(movie__isnull=False) | Q(book__isnull=False)
+    ).select_related('movie', 'book').only(
+        'movie__poster_path', 'movie__title', 'book__cover_path', 'book__title'
+    ).order_by('-created_at')[:RECENT_SCAN_LIMIT]
+    return _merge_recent([], [recent_item(activity) for activity in activities])
+
+
+def member_stats_values(user_id):
+    # Kullanıcının özeti tek toplama sorgusu ve sınırlı bir taramayla hesaplanır
+    values = Activity.objects.filter(user_id=user_id).aggregate(
+        activity_count=Count('id'),
+        movie_count=Count('id', filter=Q(movie__isnull=False)),
+        book_count=Count('id', filter=Q(book__isnull=False)),
+        review_count=Count('id', filter=Q(action_type='REVIEWED')),
+    )
+    values['recent_items'] = _recent_items(user_id)
+    return values
+
+
+def refresh_member_stats(user_ids):
+    for user_id in user_ids:
+        MemberStats.objects.update_or_create(user_id=user_id, defaults=member_stats_values(user_id))
+
+
+def _stat_deltas(activity, delta):
+    deltas = {'activity_count': delta}
+    if activity.movie_id:
+        deltas['movie_count'] = delta
+    if activity.book_id:
+        deltas['book_count'] = delta
+    if activity.action_type == 'REVIEWED':
+        deltas['review_count'] = delta
+    return deltas
+
+
+def record_activity(activity):
+    # Yeni aktivite: sayaçlar artırılır, içerik önizlemelerin başına eklenir
+    item = recent_item(activity)
+    with transaction.atomic():
+        stats, _ = MemberStats.objects.select_for_update().get_or_create(user_id=activity.user_id)
+        for field, delta in _stat_deltas(activity, 1).items():
+            setattr(stats, field, getattr(stats, field) + delta)
+        if item:
+            stats.recent_items = _merge_recent(stats.recent_items, [item])
+        stats.save()
+
+
+def forget_activity(activity):
+    # Silinen aktivite: sayaçlar azaltılır, önizlemedeyse önizlemeler yeniden seçilir
+    stats = MemberStats.objects.filter(user_id=activity.user_id)
+    stats.update(**{
+        field: Greatest(F(field) + delta, 0) for field, delta in _stat_deltas(activity, -1).items()
+    })
+    item_key = f"movie_{activity.movie_id}" if activity.movie_id else f"book_{activity.book_id}" if activity.book_id else None
+    recent_items = stats.values_list('recent_items', flat=True).first() or []
+    if item_key and any(item['key'] == item_key for item in recent_items):
+        stats.update(recent_items=_recent_items(activity.user_id))
+
+
+def leaderboard(limit=12):
+    """
+    En aktif üyeler: özet tablosundaki indeksten tek sorgu. Sayılar ve
+    önizlemeler şablonun beklediği gibi kullanıcı nesnesine eklenir.
+    """
+    rows = MemberStats.objects.filter(user__is_superuser=False).select_related(
+        'user', 'user__profile'
+    ).order_by('-activity_count')[:limit]
+
+    members = []
+    for stats in rows:
+        member = stats.user
+        member.activity_count = stats.activity_count
+        member.movie_count = stats.movie_count
+        member.book_count = stats.book_count
+        member.review_count = stats.review_count
+        member.recent_items = stats.recent_items
+        members.append(member)
+    return members
+
+
+def _popular_querysets():
+    base = Activity.objects.filter(user__is_superuser=False)
+    return {
+        'reviews': base.filter(action_type='REVIEWED', related_review__isnull=False)
+        .exclude(related_review__text='').order_by('-like_count', '-created_at'),
+        # Sayaç alanı üzerindeki indeksle (GROUP BY yok)
+        'activities': base.filter(like_count__gt=0).order_by('-like_count', '-created_at'),
+    }
+
+
+def popular_activities(kind, user, limit=6):
+    """
+    Popüler inceleme/aktivite listeleri. Sıralama (id listesi) önbellekte
+    MEMBERS_POPULAR_TTL süresince tutulur; kartlar ve izleyicinin beğenip
+    beğenmediği tek sorguda gelir, beğeni sayıları günceldir.
+    """
+    key = POPULAR_CACHE_KEY.format(kind)
+    ids = cache.get(key)
+    if ids is None:
+        ids = list(_popular_querysets()[kind].values_list('id', flat=True)[:limit])
+        cache.set(key, ids, getattr(settings, 'MEMBERS_POPULAR_TTL', 300))
+
+    activities = feed_queryset(Activity.objects.filter(id__in=ids), user).in_bulk()
+    return [activities[pk] for pk in ids if pk in activities]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_userlist_likes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieCredits',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tmdb_id', models.IntegerField(unique=True)),
+                ('directors', models.CharField(blank=True, max_length=500)),
+                ('cast', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_moviecredits'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='detail_payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='detail_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='detail_payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='detail_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='detail_payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='detail_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:09
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_catalog_detail_snapshot'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        # core/search.py içindeki normalize_text() ile aynı Türkçe katlama;
+        # indeks ifadesinde kullanılabilmesi için IMMUTABLE
+        migrations.RunSQL(
+            sql="""
+                CREATE OR REPLACE FUNCTION core_search_normalize(text) RETURNS text AS $$
+                    SELECT lower(translate($1, 'İIıŞşĞğÇçÖöÜü', 'iiissggccoouu'))
+                $$ LANGUAGE SQL IMMUTABLE PARALLEL SAFE;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS core_search_normalize(text);",
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'authors', 'description', config='turkish'), name='book_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(models.Func(models.F('title'), function='core_search_normalize'), name='gin_trgm_ops'), name='book_title_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'overview', config='turkish'), name='movie_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(models.Func(models.F('title'), function='core_search_normalize'), name='gin_trgm_ops'), name='movie_title_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tvseries',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('title', 'overview', config='turkish'), name='tvseries_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tvseries',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(models.Func(models.F('title'), function='core_search_normalize'), name='gin_trgm_ops'), name='tvseries_title_trgm_idx'),
+        ),
+    ]
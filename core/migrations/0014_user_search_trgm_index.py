@@ -0,0 +1,18 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_catalog_search_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        # Kullanıcı araması (core/search.py: search_local_users) için
+        # normalize edilmiş kullanıcı adı üzerinde trigram indeksi
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS core_auth_user_username_trgm ON auth_user USING gin (core_search_normalize(username) gin_trgm_ops);",
+            reverse_sql="DROP INDEX IF EXISTS core_auth_user_username_trgm;",
+        ),
+    ]
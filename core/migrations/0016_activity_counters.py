@@ -0,0 +1,56 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    # Mevcut beğeni, yorum ve paylaşımlardan sayaçları doldur
+    Activity = apps.get_model('core', 'Activity')
+    ActivityLike = apps.get_model('core', 'ActivityLike')
+    ActivityComment = apps.get_model('core', 'ActivityComment')
+
+    def count(queryset, field):
+        counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+            total=Count('*')
+        ).values('total')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    Activity.objects.update(
+        like_count=count(ActivityLike.objects.all(), 'activity'),
+        comment_count=count(ActivityComment.objects.all(), 'activity'),
+        share_count=count(Activity.objects.filter(action_type='SHARED'), 'original_activity'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_timelineentry'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='share_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['-like_count', '-created_at'], name='activity_like_count_idx'),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:22
+
+import core.models
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    # Mevcut puanlardan içerik başına toplam, adet, ortalama ve dağılım
+    Rating = apps.get_model('core', 'Rating')
+    for field, model_name in (('movie', 'Movie'), ('tv_series', 'TVSeries'), ('book', 'Book')):
+        model = apps.get_model('core', model_name)
+        summaries = {}
+        rows = Rating.objects.filter(**{f'{field}__isnull': False}).values(field, 'score').annotate(total=Count('id'))
+        for row in rows:
+            summary = summaries.setdefault(row[field], {'sum': 0, 'count': 0, 'histogram': [0] * 10})
+            summary['sum'] += row['score'] * row['total']
+            summary['count'] += row['total']
+            summary['histogram'][row['score'] - 1] += row['total']
+
+        items = list(model.objects.filter(pk__in=summaries).only('pk'))
+        for item in items:
+            summary = summaries[item.pk]
+            item.rating_sum = summary['sum']
+            item.rating_count = summary['count']
+            item.rating_avg = summary['sum'] / summary['count']
+            item.rating_histogram = summary['histogram']
+        model.objects.bulk_update(
+            items, ['rating_sum', 'rating_count', 'rating_avg', 'rating_histogram'], batch_size=1000
+        )
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_activity_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='rating_avg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_histogram',
+            field=models.JSONField(default=core.models.empty_histogram),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_avg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_histogram',
+            field=models.JSONField(default=core.models.empty_histogram),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='rating_avg',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='rating_histogram',
+            field=models.JSONField(default=core.models.empty_histogram),
+        ),
+        migrations.AddField(
+            model_name='tvseries',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('rating_count__gt', 0)), fields=['-rating_avg', '-rating_count'], name='book_rating_avg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(('rating_count__gt', 0)), fields=['-rating_avg', '-rating_count'], name='movie_rating_avg_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tvseries',
+            index=models.Index(condition=models.Q(('rating_count__gt', 0)), fields=['-rating_avg', '-rating_count'], name='tvseries_rating_avg_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_member_stats(apps, schema_editor):
+    # Mevcut aktivitelerden kullanıcı başına sayılar ve son 4 içerik önizlemesi
+    User = apps.get_model('auth', 'User')
+    Activity = apps.get_model('core', 'Activity')
+    MemberStats = apps.get_model('core', 'MemberStats')
+    users = User.objects.annotate(
+        activity_total=Count('activities'),
+        movie_total=Count('activities', filter=Q(activities__movie__isnull=False)),
+        book_total=Count('activities', filter=Q(activities__book__isnull=False)),
+        review_total=Count('activities', filter=Q(activities__action_type='REVIEWED')),
+    )
+    rows = []
+    for user in users.iterator(chunk_size=1000):
+        recent_items, seen = [], set()
+        activities = Activity.objects.filter(user_id=user.pk).filter(
+            Q(movie__isnull=False) | Q(book__isnull=False)
+        ).select_related('movie', 'book').order_by('-created_at')[:50]
+        for activity in activities:
+            if len(recent_items) >= 4:
+                break
+            if activity.movie_id:
+                item = {'key': f"movie_{activity.movie_id}", 'type': 'movie',
+                        'image': f"https://image.tmdb.org/t/p/w92{activity.movie.poster_path}", 'title': activity.movie.title}
+            else:
+                item = {'key': f"book_{activity.book_id}", 'type': 'book',
+                        'image': activity.book.cover_path, 'title': activity.book.title}
+            if item['key'] not in seen:
+                seen.add(item['key'])
+                recent_items.append(item)
+        rows.append(MemberStats(
+            user_id=user.pk, activity_count=user.activity_total, movie_count=user.movie_total,
+            book_count=user.book_total, review_count=user.review_total, recent_items=recent_items,
+        ))
+    MemberStats.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0018_top_rated_rankings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MemberStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='member_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('activity_count', models.PositiveIntegerField(default=0)),
+                ('movie_count', models.PositiveIntegerField(default=0)),
+                ('book_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('recent_items', models.JSONField(blank=True, default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-activity_count'], name='member_stats_activity_idx')],
+            },
+        ),
+        migrations.RunPython(fill_member_stats, migrations.RunPython.noop),
+    ]
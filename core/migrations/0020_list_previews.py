@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:27
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_list_previews(apps, schema_editor):
+    # Mevcut listeler için ilk 5 kapak ve beğeni sayısı
+    UserList = apps.get_model('core', 'UserList')
+    user_lists = UserList.objects.annotate(like_total=Count('likes'))
+    for user_list in user_lists.iterator(chunk_size=1000):
+        images = [
+            f"https://image.tmdb.org/t/p/w154{poster}"
+            for poster in user_list.movies.exclude(poster_path='').values_list('poster_path', flat=True)[:5]
+        ]
+        if len(images) < 5:
+            images += [
+                f"https://image.tmdb.org/t/p/w154{poster}"
+                for poster in user_list.tv_series.exclude(poster_path='').values_list('poster_path', flat=True)[:5 - len(images)]
+            ]
+        if len(images) < 5:
+            images += list(user_list.books.exclude(cover_path='').values_list('cover_path', flat=True)[:5 - len(images)])
+        UserList.objects.filter(pk=user_list.pk).update(preview_images=images, like_count=user_list.like_total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_member_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userlist',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='userlist',
+            name='preview_images',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(fill_list_previews, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='userlist',
+            index=models.Index(fields=['list_type', '-like_count', '-id'], name='userlist_type_likes_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_notification_retention'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['-created_at', '-id'], name='activity_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-17 01:40
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_group_started_at(apps, schema_editor):
+    # Mevcut grupların penceresi son etkileşim anından başlar; böylece eski
+    # gruplar migration anında yeniden açılmış sayılmaz
+    Notification = apps.get_model('core', 'Notification')
+    Notification.objects.update(group_started_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_activity_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='group_started_at',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(fill_group_started_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notification',
+            name='group_started_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
@@ -1,6 +1,33 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
+
+# Yerel katalog araması (core/search.py) için indeksler:
+# Türkçe tam metin (tsvector) ve normalize edilmiş başlık üzerinde trigram
+def search_indexes(prefix, *fields):
+    return [
+        GinIndex(SearchVector(*fields, config='turkish'), name=f'{prefix}_search_vector_idx'),
+        GinIndex(
+            OpClass(models.Func(models.F('title'), function='core_search_normalize'), name='gin_trgm_ops'),
+            name=f'{prefix}_title_trgm_idx'
+        ),
+    ]
+
+# Platform puanı özeti (rating_*) için: 1-10 arası her puanın adedi
+def empty_histogram():
+    return [0] * 10
+
+def rating_indexes(prefix):
+    # En yüksek puanlılar listeleri için (sadece puanı olan içerikler)
+    return [
+        models.Index(
+            fields=['-rating_avg', '-rating_count'], name=f'{prefix}_rating_avg_idx',
+            condition=models.Q(rating_count__gt=0)
+        ),
+    ]
 
 # --- 1. PROFİL ---
 class Profile(models.Model):
@@ -20,6 +47,18 @@ class Movie(models.Model):
     poster_path = models.CharField(max_length=255, blank=True)
     release_date = models.DateField(null=True, blank=True)
     vote_average = models.FloatField(default=0)
+    # Detay sayfası için upstream cevabının yerel kopyası
+    detail_payload = models.JSONField(null=True, blank=True)
+    detail_updated_at = models.DateTimeField(null=True, blank=True)
+    # Platform puanı özeti: Rating kaydedilip silindikçe transaction içinde güncellenir (core/ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True)
+    rating_histogram = models.JSONField(default=empty_histogram)
+    rating_updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = search_indexes('movie', 'title', 'overview') + rating_indexes('movie')
 
     def __str__(self):
         return self.title
@@ -31,10 +70,33 @@ class TVSeries(models.Model):
     poster_path = models.CharField(max_length=255, blank=True)
     first_air_date = models.DateField(null=True, blank=True)
     vote_average = models.FloatField(default=0)
+    # Detay sayfası için upstream cevabının yerel kopyası
+    detail_payload = models.JSONField(null=True, blank=True)
+    detail_updated_at = models.DateTimeField(null=True, blank=True)
+    # Platform puanı özeti: Rating kaydedilip silindikçe transaction içinde güncellenir (core/ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True)
+    rating_histogram = models.JSONField(default=empty_histogram)
+    rating_updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = search_indexes('tvseries', 'title', 'overview') + rating_indexes('tvseries')
 
     def __str__(self):
         return self.title
 
+class MovieCredits(models.Model):
+    # Arama sonuçlarını zenginleştirmek için TMDB yönetmen/oyuncu bilgisi
+    # (film yerel olarak kayıtlı olmasa da tmdb_id ile tutulur)
+    tmdb_id = models.IntegerField(unique=True)
+    directors = models.CharField(max_length=500, blank=True)
+    cast = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tmdb_id} - {self.directors}"
+
 class Book(models.Model):
     google_id = models.CharField(max_length=255, unique=True)
     title = models.CharField(max_length=500) 
@@ -42,6 +104,18 @@ class Book(models.Model):
     description = models.TextField(blank=True)
     cover_path = models.TextField(blank=True) 
     page_count = models.IntegerField(null=True, blank=True)
+    # Detay sayfası için upstream cevabının yerel kopyası
+    detail_payload = models.JSONField(null=True, blank=True)
+    detail_updated_at = models.DateTimeField(null=True, blank=True)
+    # Platform puanı özeti: Rating kaydedilip silindikçe transaction içinde güncellenir (core/ratings.py)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True)
+    rating_histogram = models.JSONField(default=empty_histogram)
+    rating_updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        indexes = search_indexes('book', 'title', 'authors', 'description') + rating_indexes('book')
 
     def __str__(self):
         return self.title
@@ -58,6 +132,13 @@ class Rating(models.Model):
     class Meta:
         unique_together = [['user', 'movie'], ['user', 'book'], ['user', 'tv_series']]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Güncellemede eski puanın özetten düşülebilmesi için yüklenen değer saklanır
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     movie = models.ForeignKey(Movie, on_delete=models.CASCADE, null=True, blank=True)
@@ -66,6 +147,30 @@ class Review(models.Model):
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+class TopRatedEntry(models.Model):
+    # En yüksek puanlılar sıralamasının (Bayes ortalaması) anlık görüntüsü,
+    # içerik tipi ve tür bazında; core/rankings.py tarafından yenilenir
+    CONTENT_TYPES = (
+        ('movie', 'Film'),
+        ('tv', 'Dizi'),
+        ('book', 'Kitap'),
+    )
+    content_type = models.CharField(max_length=10, choices=CONTENT_TYPES)
+    genre = models.CharField(max_length=100, blank=True)  # boş: tüm içerikler
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+
+    movie = models.ForeignKey(Movie, on_delete=models.CASCADE, null=True, blank=True)
+    tv_series = models.ForeignKey(TVSeries, on_delete=models.CASCADE, null=True, blank=True)
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, null=True, blank=True)
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['content_type', 'genre', 'rank'], name='top_rated_rank_idx'),
+        ]
+
 # --- 4. AKTİVİTE AKIŞI ---
 class Activity(models.Model):
     ACTION_TYPES = (
@@ -89,9 +194,50 @@ class Activity(models.Model):
     related_comment = models.ForeignKey('ActivityComment', on_delete=models.SET_NULL, null=True, blank=True, related_name='activity_reference')
     
     original_activity = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='shares')
+
+    # Etkileşim sayaçları: signal'lerde F() ile artırılır/azaltılır,
+    # sapmalar reconcile_activity_counters komutuyla düzeltilir
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    share_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-like_count', '-created_at'], name='activity_like_count_idx'),
+            # Keşfet ve API akışının (created_at, id) imleçli sayfalaması
+            models.Index(fields=['-created_at', '-id'], name='activity_created_id_idx'),
+        ]
+
+class TimelineEntry(models.Model):
+    # Ana sayfa zaman tüneli: aktivite oluşturulduğunda takipçilere dağıtılır (fan-out-on-write)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    activity = models.ForeignKey(Activity, on_delete=models.CASCADE, related_name='timeline_entries')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('owner', 'activity')
+        indexes = [
+            models.Index(fields=['owner', '-created_at', '-activity'], name='timeline_owner_created_idx'),
+            models.Index(fields=['owner', 'actor'], name='timeline_owner_actor_idx'),
+        ]
+
+class MemberStats(models.Model):
+    # Üyeler sayfası için kullanıcı başına aktivite özeti ve son içerik önizlemeleri
+    # (aktivite signal'leriyle güncellenir, bkz. core/members.py)
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='member_stats')
+    activity_count = models.PositiveIntegerField(default=0)
+    movie_count = models.PositiveIntegerField(default=0)
+    book_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    recent_items = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-activity_count'], name='member_stats_activity_idx'),
+        ]
 
 class ActivityLike(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -117,11 +263,41 @@ class Notification(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_notifications')
     notification_type = models.CharField(max_length=20, choices=NOTIFICATION_TYPES)
     activity = models.ForeignKey(Activity, on_delete=models.CASCADE, null=True, blank=True)
+    # Gruplanmış bildirim: aynı (alıcı, tür, aktivite) için zaman penceresindeki
+    # tüm göndericiler tek satırda (core/notifications.py). sender en sonuncusudur;
+    # eski satırlarda actor_ids boştur ve sadece sender sayılır.
+    actor_ids = models.JSONField(default=list, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
     is_read = models.BooleanField(default=False)
+    # Grubun açıldığı an; gruplama penceresi buna göre işler. created_at her yeni
+    # etkileşimde güncellenip bildirimi başa taşır, pencereyi uzatmaz.
+    group_started_at = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Okunmamış sayısı/son bildirimler, gruplama ve "tümünü okundu yap"
+            models.Index(fields=['recipient', 'is_read', '-created_at'], name='notif_recipient_read_idx'),
+            # Bildirimler sayfasının imleçli sayfalaması
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notif_recipient_created_idx'),
+        ]
+
+class NotificationArchive(models.Model):
+    # Saklama süresini aşan okunmuş bildirimler (archive_notifications komutu).
+    # Gönderen ve aktivite sonradan silinebileceği için sadece kimlikleri tutulur.
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    sender_id = models.IntegerField()
+    notification_type = models.CharField(max_length=20, choices=Notification.NOTIFICATION_TYPES)
+    activity_id = models.IntegerField(null=True, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at'], name='notif_archive_recipient_idx'),
+        ]
 
 # --- 5. LİSTELER ---
 class UserList(models.Model):
@@ -142,6 +318,15 @@ class UserList(models.Model):
     books = models.ManyToManyField(Book, blank=True, related_name='lists')
     
     likes = models.ManyToManyField(User, related_name='liked_lists', blank=True)
+    # Liste sayfası için saklanan özet: ilk 5 kapak ve beğeni sayısı
+    # (m2m değişikliklerinde signal'lerle güncellenir, bkz. core/lists.py)
+    preview_images = models.JSONField(default=list, blank=True)
+    like_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['list_type', '-like_count', '-id'], name='userlist_type_likes_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.name}"
@@ -0,0 +1,228 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Notification, NotificationArchive
+from .realtime import publish_to_users
+
+# Okunmamış bildirim sayısı ve menüdeki son 5 bildirim (kullanıcı başına).
+# İlk ihtiyaçta hesaplanır; yeni bildirimde sayı artırılır, liste düşürülür,
+# bildirimler sayfası açılınca ikisi de sıfırlanır.
+UNREAD_COUNT_KEY = 'notifications:unread_count:{}'
+UNREAD_LATEST_KEY = 'notifications:unread_latest:{}'
+UNREAD_LATEST_SIZE = 5
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+def _timeout():
+    # Kaçırılan bir güncellemenin (ör. önbellek yazma hatası) en fazla bu süre yaşaması için
+    return getattr(settings, 'NOTIFICATION_SUMMARY_TTL', 3600)
+
+
+def _summary_item(notification):
+    # Şablon için düz sözlük (önbellekte model nesnesi tutulmaz)
+    profile = getattr(notification.sender, 'profile', None)
+    return {
+        'sender': {
+            'username': notification.sender.username,
+            'avatar': profile.avatar.url if profile and profile.avatar else None,
+        },
+        'notification_type': notification.notification_type,
+        'actor_count': notification.actor_count,
+        'created_at': notification.created_at,
+    }
+
+
+def unread_count(user):
+    key = UNREAD_COUNT_KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = user.notifications.filter(is_read=False).count()
+        cache.set(key, count, _timeout())
+    return count
+
+
+def unread_latest(user):
+    key = UNREAD_LATEST_KEY.format(user.pk)
+    latest = cache.get(key)
+    if latest is None:
+        notifications = user.notifications.filter(is_read=False).select_related(
+            'sender', 'sender__profile'
+        ).order_by('-created_at')[:UNREAD_LATEST_SIZE]
+        latest = [_summary_item(notification) for notification in notifications]
+        cache.set(key, latest, _timeout())
+    return latest
+
+
+def drop_unread_latest(recipient_ids):
+    cache.delete_many([UNREAD_LATEST_KEY.format(recipient_id) for recipient_id in recipient_ids])
+
+
+def notification_added(recipient_id):
+    # Sayı önbellekte yoksa dokunulmaz (ilk okumada doğru değer hesaplanır)
+    try:
+        cache.incr(UNREAD_COUNT_KEY.format(recipient_id))
+    except ValueError:
+        pass
+    cache.delete(UNREAD_LATEST_KEY.format(recipient_id))
+
+
+def invalidate_unread_summary(recipient_id):
+    cache.delete_many([UNREAD_COUNT_KEY.format(recipient_id), UNREAD_LATEST_KEY.format(recipient_id)])
+
+
+def reset_unread_summary(recipient_id):
+    # Tüm bildirimler okundu işaretlendikten sonra
+    cache.set_many({UNREAD_COUNT_KEY.format(recipient_id): 0, UNREAD_LATEST_KEY.format(recipient_id): []}, _timeout())
+
+
+# --- Bildirim gruplama ---
+# Aynı (alıcı, tür, aktivite) için NOTIFICATION_GROUP_WINDOW içindeki okunmamış
+# bildirimler tek satırda toplanır: "X ve 12 kişi daha gönderini beğendi".
+# Beğen/geri al tekrarları yeni satır üretmez; satırlar toplu yazılır.
+
+def _window_start():
+    return timezone.now() - timedelta(seconds=getattr(settings, 'NOTIFICATION_GROUP_WINDOW', 21600))
+
+
+def _actors(notification):
+    return list(notification.actor_ids) or [notification.sender_id]
+
+
+def _open_groups(keys):
+    condition = Q()
+    for recipient_id, notification_type, activity_id in keys:
+        condition |= Q(recipient_id=recipient_id, notification_type=notification_type, activity_id=activity_id)
+    groups = Notification.objects.select_for_update().filter(
+        condition, is_read=False, group_started_at__gte=_window_start()
+    ).order_by('group_started_at')
+    # Aynı anahtar için birden fazla açık grup varsa en yenisi kullanılır
+    return {(group.recipient_id, group.notification_type, group.activity_id): group for group in groups}
+
+
+def announce_new(notifications):
+    # Okunmamış sayısını artır, bağlı istemcilere anlık bildirim gönder (core/realtime.py)
+    if not notifications:
+        return
+    usernames = dict(User.objects.filter(pk__in={n.sender_id for n in notifications}).values_list('pk', 'username'))
+    events = []
+    for notification in notifications:
+        notification_added(notification.recipient_id)
+        events.append((notification.recipient_id, {
+            'type': 'notification',
+            'id': notification.id,
+            'notification_type': notification.notification_type,
+            'sender': usernames.get(notification.sender_id),
+        }))
+
+    def publish():
+        for recipient_id, event in events:
+            publish_to_users([recipient_id], event)
+    transaction.on_commit(publish)
+
+
+def notify_many(events):
+    """
+    (alıcı_id, gönderen_id, tür, aktivite_id) olaylarını açık gruplara ekler,
+    grubu olmayanlar için tek bulk_create ile yeni satır açar.
+    """
+    grouped = {}
+    for recipient_id, sender_id, notification_type, activity_id in events:
+        if recipient_id == sender_id:
+            continue
+        sender_ids = grouped.setdefault((recipient_id, notification_type, activity_id), [])
+        if sender_id not in sender_ids:
+            sender_ids.append(sender_id)
+    if not grouped:
+        return
+
+    now = timezone.now()
+    created, updated = [], []
+    with transaction.atomic():
+        groups = _open_groups(grouped)
+        for key, sender_ids in grouped.items():
+            group = groups.get(key)
+            if group is None:
+                recipient_id, notification_type, activity_id = key
+                created.append(Notification(
+                    recipient_id=recipient_id, sender_id=sender_ids[-1], notification_type=notification_type,
+                    activity_id=activity_id, actor_ids=sender_ids, actor_count=len(sender_ids),
+                    group_started_at=now,
+                ))
+                continue
+
+            actors = _actors(group)
+            new_sender_ids = [sender_id for sender_id in sender_ids if sender_id not in actors]
+            if not new_sender_ids:
+                continue
+            group.actor_ids = actors + new_sender_ids
+            group.actor_count = len(group.actor_ids)
+            group.sender_id = new_sender_ids[-1]
+            # Grup yeni etkileşimle listenin başına çıkar; pencere group_started_at'ten
+            # sayıldığı için sürekli etkileşim alan grup sonsuza dek açık kalmaz
+            group.created_at = now
+            updated.append(group)
+
+        Notification.objects.bulk_create(created, batch_size=1000)
+        Notification.objects.bulk_update(updated, ['sender', 'actor_ids', 'actor_count', 'created_at'], batch_size=1000)
+
+    announce_new(created)
+    drop_unread_latest({group.recipient_id for group in updated})
+
+
+def notify(recipient_id, sender_id, notification_type, activity_id=None):
+    notify_many([(recipient_id, sender_id, notification_type, activity_id)])
+
+
+def retract(recipient_id, sender_id, notification_type, activity_id=None):
+    # Beğeni geri alındığında gönderen okunmamış gruptan çıkarılır, grup boşalırsa silinir
+    with transaction.atomic():
+        group = Notification.objects.select_for_update().filter(
+            recipient_id=recipient_id, notification_type=notification_type, activity_id=activity_id, is_read=False
+        ).order_by('-created_at').first()
+        if group is None:
+            return
+        actors = _actors(group)
+        if sender_id not in actors:
+            return
+        actors.remove(sender_id)
+        if not actors:
+            group.delete()
+            return
+        group.actor_ids = actors
+        group.actor_count = len(actors)
+        group.sender_id = actors[-1]
+        group.save(update_fields=['actor_ids', 'actor_count', 'sender'])
+
+
+# --- Saklama ve arşivleme ---
+
+def archive_read_notifications(older_than_days, chunk_size=5000):
+    """
+    older_than_days günden eski okunmuş bildirimleri arşiv tablosuna taşır.
+    Uzun kilitlerden kaçınmak için her parça ayrı transaction'da kopyalanıp
+    silinir; taşınan toplam satır sayısını döner.
+    """
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    fields = ('recipient_id', 'sender_id', 'notification_type', 'activity_id', 'actor_count', 'created_at')
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.select_for_update(skip_locked=True)
+                .filter(is_read=True, created_at__lt=cutoff)
+                .order_by('id').values('id', *fields)[:chunk_size]
+            )
+            if not rows:
+                break
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**{field: row[field] for field in fields}) for row in rows], batch_size=1000
+            )
+            Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        total += len(rows)
+    return total
@@ -0,0 +1,172 @@
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from .models import Movie, TVSeries, Book, TopRatedEntry
+
+# İçerik tipi -> (model, TopRatedEntry alanı, detay kopyasındaki tür yolu)
+RANKED_MODELS = {
+    'movie': (Movie, 'movie', 'detail_payload__genres'),
+    'tv': (TVSeries, 'tv_series', 'detail_payload__genres'),
+    'book': (Book, 'book', 'detail_payload__volumeInfo__categories'),
+}
+
+
+def _genres(content_type, value):
+    # TMDB: [{'id': 28, 'name': 'Aksiyon'}], Google Books: ['Fiction', ...]
+    if not isinstance(value, list):
+        return []
+    if content_type == 'book':
+        return [str(category).lower()[:100] for category in value if category]
+    return [str(genre['id']) for genre in value if isinstance(genre, dict) and genre.get('id')]
+
+
+def bayesian_score(rating_sum, rating_count, mean, prior_votes):
+    """
+    Bayes ortalaması: az oylu içeriklerin puanı platform ortalamasına çekilir,
+    tek bir 10/10 oy listenin başına çıkamaz.
+    """
+    return (prior_votes * mean + rating_sum) / (prior_votes + rating_count)
+
+
+def _prior(model):
+    totals = model.objects.aggregate(total=Sum('rating_sum'), votes=Sum('rating_count'))
+    mean = totals['total'] / totals['votes'] if totals['votes'] else 0
+    return mean, getattr(settings, 'RANKING_PRIOR_VOTES', 5)
+
+
+def _scored_items(content_type, queryset, mean, prior_votes):
+    _, _, genre_path = RANKED_MODELS[content_type]
+    for row in queryset.values('pk', 'rating_sum', 'rating_count', genre_path):
+        if not row['rating_count']:
+            continue
+        yield {
+            'id': row['pk'],
+            'score': bayesian_score(row['rating_sum'], row['rating_count'], mean, prior_votes),
+            'rating_count': row['rating_count'],
+            'genres': _genres(content_type, row[genre_path]),
+        }
+
+
+def _top(candidates):
+    size = getattr(settings, 'RANKING_SIZE', 100)
+    return sorted(candidates, key=lambda c: (-c['score'], -c['rating_count'], c['id']))[:size]
+
+
+def _write_lists(content_type, lists, computed_at, replace_all=False):
+    # Her liste (tür) tek transaction içinde yeniden yazılır
+    _, field, _ = RANKED_MODELS[content_type]
+    entries = [
+        TopRatedEntry(
+            content_type=content_type, genre=genre, rank=rank, score=candidate['score'],
+            computed_at=computed_at, **{f"{field}_id": candidate['id']}
+        )
+        for genre, candidates in lists.items()
+        for rank, candidate in enumerate(candidates, start=1)
+    ]
+    with transaction.atomic():
+        existing = TopRatedEntry.objects.filter(content_type=content_type)
+        if not replace_all:
+            existing = existing.filter(genre__in=list(lists))
+        existing.delete()
+        TopRatedEntry.objects.bulk_create(entries, batch_size=1000)
+        TopRatedEntry.objects.filter(content_type=content_type).update(computed_at=computed_at)
+
+
+def full_refresh(content_type):
+    model, _, _ = RANKED_MODELS[content_type]
+    computed_at = timezone.now()
+    mean, prior_votes = _prior(model)
+
+    lists = {'': []}
+    for item in _scored_items(content_type, model.objects.filter(rating_count__gt=0), mean, prior_votes):
+        lists[''].append(item)
+        for genre in item['genres']:
+            lists.setdefault(genre, []).append(item)
+    _write_lists(content_type, {genre: _top(candidates) for genre, candidates in lists.items()}, computed_at, replace_all=True)
+
+
+def incremental_refresh(content_type, since):
+    """
+    Sadece son yenilemeden beri puanı değişen içerikler yeniden puanlanıp
+    etkilenen listelere yerleştirilir. Diğer içeriklerin puanlarındaki
+    (ortalamanın kayması, listeden düşen içeriğin yerine gelecek aday gibi)
+    küçük farklar bir sonraki tam yenilemede düzelir. Değişen içerik sayısı
+    RANKING_INCREMENTAL_LIMIT'i aşarsa False döner (tam yenileme gerekir).
+    """
+    model, field, _ = RANKED_MODELS[content_type]
+    computed_at = timezone.now()
+    changed_queryset = model.objects.filter(rating_updated_at__gt=since)
+    limit = getattr(settings, 'RANKING_INCREMENTAL_LIMIT', 500)
+    changed_ids = list(changed_queryset.values_list('pk', flat=True)[:limit + 1])
+    if len(changed_ids) > limit:
+        return False
+    if not changed_ids:
+        TopRatedEntry.objects.filter(content_type=content_type).update(computed_at=computed_at)
+        return True
+
+    mean, prior_votes = _prior(model)
+    changed = list(_scored_items(content_type, model.objects.filter(pk__in=changed_ids), mean, prior_votes))
+    affected = {''} | {genre for item in changed for genre in item['genres']}
+    # Puanı tamamen silinen içerikler de listelerden çıkar
+    affected |= set(
+        TopRatedEntry.objects.filter(content_type=content_type, **{f"{field}_id__in": changed_ids})
+        .values_list('genre', flat=True)
+    )
+
+    lists = {genre: [] for genre in affected}
+    current = TopRatedEntry.objects.filter(content_type=content_type, genre__in=affected).exclude(
+        **{f"{field}_id__in": changed_ids}
+    ).values('genre', 'score', f"{field}_id", f"{field}__rating_count")
+    for row in current:
+        lists[row['genre']].append({'id': row[f"{field}_id"], 'score': row['score'], 'rating_count': row[f"{field}__rating_count"]})
+    for item in changed:
+        for genre in [''] + item['genres']:
+            lists[genre].append(item)
+
+    _write_lists(content_type, {genre: _top(candidates) for genre, candidates in lists.items()}, computed_at)
+    return True
+
+
+def refresh_rankings(content_type, full=False):
+    last = TopRatedEntry.objects.filter(content_type=content_type).aggregate(last=Max('computed_at'))['last']
+    if full or last is None or not incremental_refresh(content_type, last):
+        full_refresh(content_type)
+
+
+def _refresh_in_background(content_type):
+    try:
+        refresh_rankings(content_type)
+    finally:
+        close_old_connections()
+
+
+def top_rated(content_type, genre='', limit=5):
+    """
+    Sıralama anlık görüntüsünden ilk `limit` içerik (tek indeksli sorgu).
+    Görüntü RANKING_TTL'den eskiyse arka planda (workerlar arası tek sefer)
+    artımlı olarak yenilenir; bu sırada mevcut görüntü sunulur.
+    """
+    _, field, _ = RANKED_MODELS[content_type]
+    # Görüntüden sonra tüm puanları silinen içerikler (rating_avg boş) atlanır
+    entries = list(
+        TopRatedEntry.objects.filter(content_type=content_type, genre=genre or '', **{f"{field}__rating_count__gt": 0})
+        .select_related(field).order_by('rank')[:limit]
+    )
+
+    ttl = getattr(settings, 'RANKING_TTL', 3600)
+    stale = not entries or entries[0].computed_at < timezone.now() - timedelta(seconds=ttl)
+    if stale and cache.add(f"rankings:refreshing:{content_type}", 1, timeout=min(ttl, 300)):
+        threading.Thread(target=_refresh_in_background, args=(content_type,), daemon=True).start()
+
+    items = []
+    for entry in entries:
+        item = getattr(entry, field)
+        item.ranking_score = entry.score
+        items.append(item)
+    return items
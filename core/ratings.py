@@ -0,0 +1,61 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Movie, TVSeries, Book, empty_histogram
+
+# Rating üzerindeki alan -> puanlanan içerik modeli
+RATED_MODELS = (
+    ('movie_id', Movie),
+    ('tv_series_id', TVSeries),
+    ('book_id', Book),
+)
+
+
+def _rated_item(rating):
+    for field, model in RATED_MODELS:
+        item_id = getattr(rating, field)
+        if item_id:
+            return model, item_id
+    return None, None
+
+
+def summary_values(rating_sum, rating_count, histogram):
+    return {
+        'rating_sum': rating_sum,
+        'rating_count': rating_count,
+        'rating_avg': rating_sum / rating_count if rating_count else None,
+        'rating_histogram': histogram,
+    }
+
+
+def apply_rating_change(rating, old_score=None, new_score=None):
+    """
+    İçeriğin puan özetini (toplam, adet, ortalama, dağılım) günceller:
+    yeni puan için old_score=None, silme için new_score=None verilir.
+    İçerik satırı kilitlenir; eşzamanlı puanlamalar birbirini ezmez.
+    """
+    model, item_id = _rated_item(rating)
+    if model is None or old_score == new_score:
+        return
+
+    with transaction.atomic():
+        item = model.objects.select_for_update().filter(pk=item_id).values(
+            'rating_sum', 'rating_count', 'rating_histogram'
+        ).first()
+        if item is None:
+            return
+        rating_sum, rating_count = item['rating_sum'], item['rating_count']
+        histogram = list(item['rating_histogram'] or empty_histogram())
+        if old_score:
+            rating_sum -= old_score
+            rating_count -= 1
+            histogram[old_score - 1] = max(histogram[old_score - 1] - 1, 0)
+        if new_score:
+            rating_sum += new_score
+            rating_count += 1
+            histogram[new_score - 1] += 1
+        # rating_updated_at: sıralamaların artımlı yenilenmesi için (core/rankings.py)
+        model.objects.filter(pk=item_id).update(
+            rating_updated_at=timezone.now(),
+            **summary_values(max(rating_sum, 0), max(rating_count, 0), histogram)
+        )
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+# Bağlantı başına bekleyen olay sınırı; yavaş istemcide en eski olay atılır
+SUBSCRIBER_QUEUE_SIZE = 100
+# Redis bağlantısı koparsa yeniden bağlanma beklemesi (saniye, üstel artar)
+REDIS_RECONNECT_MIN_DELAY = 1
+REDIS_RECONNECT_MAX_DELAY = 30
+
+logger = logging.getLogger(__name__)
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+def actor_channel(user_id):
+    # Fan-out yapılmayan (çok takipçili) hesapların aktiviteleri bu kanala
+    # tek sefer yayınlanır, takipçilerin bağlantıları bu kanala da abone olur
+    return f"actor:{user_id}"
+
+
+class Subscription:
+    """Bir bağlantının abonelikleri: olaylar asyncio kuyruğunda birikir."""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = list(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _put(self, event):
+        # Event loop thread'inde çalışır
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        # Herhangi bir thread'den çağrılabilir (signal'ler senkron çalışır)
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop kapanmış; bağlantı zaten kopmuş
+            pass
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Süreç içi yayın/abone aracı. Sadece tek worker süreçli kurulumda çalışır:
+    olay hangi süreçte yayınlanırsa sadece o sürecin bağlantılarına ulaşır.
+    Birden fazla worker (aynı makinede bile) varsa RedisBroker kullanılmalıdır.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._channels.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, channel, event):
+        self._dispatch(channel, event)
+
+    def publish_many(self, channels, event):
+        for channel in channels:
+            self._dispatch(channel, event)
+
+    def _dispatch(self, channel, event):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def connection_count(self):
+        with self._lock:
+            return len({s for subscribers in self._channels.values() for s in subscribers})
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Redis pub/sub üzerinden çok sunuculu yayın. Her süreç tek bir dinleyici
+    thread'i ile kanalları dinler ve olayları kendi bağlantılarına dağıtır.
+    REALTIME_REDIS_URL ayarı ve redis paketi gerekir.
+    """
+
+    prefix = 'realtime:'
+
+    def __init__(self):
+        super().__init__()
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker için 'redis' paketi kurulu olmalı.")
+        url = getattr(settings, 'REALTIME_REDIS_URL', None)
+        if not url:
+            raise ImproperlyConfigured("RedisBroker için REALTIME_REDIS_URL ayarlanmalı.")
+        self._redis = redis.Redis.from_url(url)
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def publish(self, channel, event):
+        self._redis.publish(self.prefix + channel, json.dumps(event))
+
+    def publish_many(self, channels, event):
+        # Fan-out'ta binlerce kanal olabilir: tek gidiş-dönüşte gönderilir
+        payload = json.dumps(event)
+        with self._redis.pipeline(transaction=False) as pipe:
+            for channel in channels:
+                pipe.publish(self.prefix + channel, payload)
+            pipe.execute()
+
+    def _listen(self):
+        # Bağlantı koparsa thread ölmez: hata loglanır, beklenip yeniden abone olunur
+        delay = REDIS_RECONNECT_MIN_DELAY
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.prefix + '*')
+                delay = REDIS_RECONNECT_MIN_DELAY
+                for message in pubsub.listen():
+                    self._handle(message)
+            except Exception:
+                logger.exception("Redis dinleyicisi koptu, %s saniye sonra yeniden bağlanılacak", delay)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            time.sleep(delay)
+            delay = min(delay * 2, REDIS_RECONNECT_MAX_DELAY)
+
+    def _handle(self, message):
+        # Bozuk bir mesaj dinleyiciyi durdurmaz
+        try:
+            channel = message['channel'].decode()[len(self.prefix):]
+            event = json.loads(message['data'])
+        except (KeyError, AttributeError, TypeError, ValueError):
+            logger.warning("Geçersiz anlık olay mesajı atlandı: %r", message)
+            return
+        self._dispatch(channel, event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'REALTIME_BROKER', 'core.realtime.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish(channel, event):
+    get_broker().publish(channel, event)
+
+
+def publish_to_users(user_ids, event):
+    get_broker().publish_many([user_channel(user_id) for user_id in user_ids], event)
+
+
+async def event_stream(channels):
+    """
+    Server-Sent Events akışı. Boşta bekleyen bağlantı sadece bir coroutine
+    ve bir kuyruktur; ASGI sunucusunda düğüm başına on binlerce bağlantı
+    tutulabilir. Proxy'lerin bağlantıyı kapatmaması için düzenli ping atılır.
+    """
+    subscription = get_broker().subscribe(channels)
+    heartbeat = getattr(settings, 'REALTIME_HEARTBEAT', 25)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
@@ -0,0 +1,129 @@
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+from django.db.models import Count, F, Func, IntegerField, OuterRef, Q, Subquery, TextField
+from django.db.models.functions import Coalesce
+
+from .models import Movie, TVSeries, Book, Profile
+
+# Türkçe karakterler için büyük/küçük harf ve aksan katlama tablosu.
+# Veritabanındaki core_search_normalize() fonksiyonu ile birebir aynı olmalı.
+TURKISH_FOLD_FROM = 'İIıŞşĞğÇçÖöÜü'
+TURKISH_FOLD_TO = 'iiissggccoouu'
+_TURKISH_FOLD = str.maketrans(TURKISH_FOLD_FROM, TURKISH_FOLD_TO)
+
+SEARCH_CONFIG = 'turkish'
+LOCAL_SEARCH_LIMIT = 20
+
+
+def normalize_text(text):
+    # "IŞIK" ve "ışık" ile "isik" aynı anahtara düşer
+    return (text or '').translate(_TURKISH_FOLD).lower().strip()
+
+
+class SearchNormalize(Func):
+    # Trigram indeksinde kullanılan IMMUTABLE SQL fonksiyonu (bkz. migration)
+    function = 'core_search_normalize'
+    output_field = TextField()
+
+
+def movie_search_vector():
+    return SearchVector('title', 'overview', config=SEARCH_CONFIG)
+
+
+def tv_series_search_vector():
+    return SearchVector('title', 'overview', config=SEARCH_CONFIG)
+
+
+def book_search_vector():
+    return SearchVector('title', 'authors', 'description', config=SEARCH_CONFIG)
+
+
+def _ranked_search(queryset, vector, query, limit):
+    normalized = normalize_text(query)
+    if not normalized:
+        return queryset.none()
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG)
+    return queryset.annotate(
+        document=vector,
+        normalized_title=SearchNormalize(F('title')),
+    ).annotate(
+        rank=SearchRank(F('document'), search_query) + TrigramSimilarity('normalized_title', normalized),
+    ).filter(
+        Q(document=search_query) | Q(normalized_title__trigram_similar=normalized)
+    ).order_by('-rank')[:limit]
+
+
+def search_local_movies(query, limit=LOCAL_SEARCH_LIMIT):
+    # Sonuçlar TMDB arama cevabıyla aynı biçimde döner
+    movies = _ranked_search(Movie.objects.defer('detail_payload'), movie_search_vector(), query, limit)
+    return [{
+        'id': movie.tmdb_id,
+        'title': movie.title,
+        'overview': movie.overview,
+        'poster_path': movie.poster_path or None,
+        'release_date': movie.release_date.isoformat() if movie.release_date else '',
+        'vote_average': movie.vote_average,
+    } for movie in movies]
+
+
+def search_local_tv_series(query, limit=LOCAL_SEARCH_LIMIT):
+    series = _ranked_search(TVSeries.objects.defer('detail_payload'), tv_series_search_vector(), query, limit)
+    return [{
+        'id': tv.tmdb_id,
+        'name': tv.title,
+        'overview': tv.overview,
+        'poster_path': tv.poster_path or None,
+        'first_air_date': tv.first_air_date.isoformat() if tv.first_air_date else '',
+        'vote_average': tv.vote_average,
+    } for tv in series]
+
+
+def search_local_books(query, limit=LOCAL_SEARCH_LIMIT):
+    # Google Books sonuçlarıyla (search_books) aynı biçim
+    books = _ranked_search(Book.objects.defer('detail_payload'), book_search_vector(), query, limit)
+    return [{
+        'google_id': book.google_id,
+        'title': book.title,
+        'authors': book.authors or "Yazar Bilinmiyor",
+        'cover_url': book.cover_path,
+    } for book in books]
+
+
+def _follower_count():
+    # Kullanıcının takipçi sayısı (GROUP BY yerine satır başına alt sorgu)
+    followers = Profile.following.through.objects.filter(
+        to_profile__user_id=OuterRef('pk')
+    ).order_by().values('to_profile').annotate(total=Count('*')).values('total')
+    return Coalesce(Subquery(followers, output_field=IntegerField()), 0)
+
+
+def search_local_users(query, limit=5):
+    """
+    Kullanıcı adında arama: normalize edilmiş kullanıcı adı üzerindeki
+    trigram indeksiyle (LIKE ve benzerlik) çalışır, benzerlik ve takipçi
+    sayısına göre sıralanır. Profil ve avatar aynı sorguda gelir.
+    """
+    normalized = normalize_text(query)
+    if not normalized:
+        return []
+
+    users = User.objects.filter(is_superuser=False).select_related('profile').only('username', 'profile__avatar')
+    users = users.annotate(
+        normalized_username=SearchNormalize(F('username')),
+    ).filter(
+        Q(normalized_username__contains=normalized) | Q(normalized_username__trigram_similar=normalized)
+    ).annotate(
+        similarity=TrigramSimilarity('normalized_username', normalized),
+        follower_count=_follower_count(),
+    ).order_by('-similarity', '-follower_count')
+
+    results = []
+    for user in users[:limit]:
+        profile = getattr(user, 'profile', None)
+        results.append({
+            'username': user.username,
+            'avatar': profile.avatar.url if profile and profile.avatar else None,
+            'follower_count': user.follower_count,
+        })
+    return results
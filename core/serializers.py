@@ -2,6 +2,42 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Profile, Movie, Book, Rating, Review, Activity
 
+def parse_fields(fields):
+    # "id,movie.title,movie.poster_path" -> {'id': None, 'movie': {'title': None, 'poster_path': None}}
+    spec = {}
+    for path in fields:
+        node = spec
+        parts = [part for part in path.strip().split('.') if part]
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node.setdefault(part, None)
+            else:
+                if not node.get(part):
+                    node[part] = {}
+                node = node[part]
+    return spec
+
+
+class SparseFieldsMixin:
+    """
+    `fields` parametresi verilirse sadece istenen alanlar serialize edilir
+    (?fields=id,user,movie.title). İç içe serializer'lar noktalı yazımla kısıtlanır.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields:
+            self._restrict(self, parse_fields(fields))
+
+    @classmethod
+    def _restrict(cls, serializer, spec):
+        for name in list(serializer.fields):
+            if name not in spec:
+                serializer.fields.pop(name)
+            elif spec[name] and isinstance(serializer.fields[name], serializers.Serializer):
+                cls._restrict(serializer.fields[name], spec[name])
+
+
 class UserSerializer(serializers.ModelSerializer):
     avatar = serializers.SerializerMethodField()
     
@@ -14,17 +50,25 @@ class UserSerializer(serializers.ModelSerializer):
             return obj.profile.avatar.url
         return None
 
+# Detay sayfası kopyası (detail_payload) sadece sunucu tarafında tutulur;
+# API'de ne okunur ne de yazılabilir
+DETAIL_SNAPSHOT_FIELDS = ['detail_payload', 'detail_updated_at']
+# Platform puanı özeti sadece Rating değişikliklerinden (core/ratings.py) güncellenir
+RATING_SUMMARY_FIELDS = ['rating_sum', 'rating_count', 'rating_avg', 'rating_histogram', 'rating_updated_at']
+
 class MovieSerializer(serializers.ModelSerializer):
     class Meta:
         model = Movie
-        fields = '__all__'
+        exclude = DETAIL_SNAPSHOT_FIELDS
+        read_only_fields = RATING_SUMMARY_FIELDS
 
 class BookSerializer(serializers.ModelSerializer):
     class Meta:
         model = Book
-        fields = '__all__'
+        exclude = DETAIL_SNAPSHOT_FIELDS
+        read_only_fields = RATING_SUMMARY_FIELDS
 
-class ActivitySerializer(serializers.ModelSerializer):
+class ActivitySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     movie = MovieSerializer(read_only=True)
     book = BookSerializer(read_only=True)
@@ -1,76 +1,215 @@
-import requests
+import logging
 import os
-from django.contrib.auth.models import User
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, TimeoutError
+from .models import MovieCredits, Movie, TVSeries, Book
+from .search import search_local_movies, search_local_tv_series, search_local_books, search_local_users
+from .upstream import get_json
 
 # API KEY
 TMDB_API_KEY = os.getenv('TMDB_API_KEY')
 TMDB_URL = "https://api.themoviedb.org/3"
 GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
 
-def get_movie_director(movie_id):
+# Arama sonuçlarında saklanan oyuncu sayısı
+CREDITS_CAST_SIZE = 5
+
+logger = logging.getLogger(__name__)
+
+# Arama kaynakları ve yönetmen sorguları için paylaşılan thread havuzları
+# (iç içe, istek başına açılan havuzlar yerine). Her arama 4 iş gönderir;
+# SEARCH_MAX_WORKERS beklenen eşzamanlı arama sayısının 4 katı olmalıdır.
+_search_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'SEARCH_MAX_WORKERS', 64), thread_name_prefix='search'
+)
+_credits_executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix='credits')
+_snapshot_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='snapshot')
+
+def _run_with_db(func, *args, **kwargs):
+    # Thread içinde açılan veritabanı bağlantısı iş bitince kapatılır
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+def _remaining(deadline):
+    # Arama süresinden kalan kısım; upstream isteği bundan uzun sürmez
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.1)
+
+def get_movie_credits(movie_id):
     url = f"{TMDB_URL}/movie/{movie_id}/credits"
     params = {'api_key': TMDB_API_KEY}
     try:
-        response = requests.get(url, params=params, timeout=2)
-        if response.status_code == 200:
-            crew = response.json().get('crew', [])
+        data = get_json(url, params, timeout=2)
+        if data is not None:
+            crew = data.get('crew', [])
             directors = [member['name'] for member in crew if member['job'] == 'Director']
-            return ", ".join(directors)
+            cast = [member['name'] for member in data.get('cast', [])[:CREDITS_CAST_SIZE]]
+            return {'directors': ", ".join(directors), 'cast': cast}
     except:
         pass
-    return ""
+    return None
 
-def search_content_service(query):
-    movies = search_movies(query)
-    books = search_books(query)
-    tv_series = search_tv_series(query)
-    
-    users = User.objects.filter(username__icontains=query, is_superuser=False)[:5]
-    user_results = []
-    for user in users:
-        avatar_url = user.profile.avatar.url if hasattr(user, 'profile') and user.profile.avatar else None
-        user_results.append({
-            'username': user.username,
-            'avatar': avatar_url
-        })
-
-    return {'movies': movies, 'books': books, 'tv_series': tv_series, 'users': user_results}
-
-def search_movies(query):
+def _store_movie_credits(fetched):
+    # {tmdb_id: {'directors': ..., 'cast': [...]}} tek sorguda upsert edilir
+    now = timezone.now()
+    MovieCredits.objects.bulk_create(
+        [MovieCredits(tmdb_id=movie_id, updated_at=now, **credits) for movie_id, credits in fetched.items()],
+        update_conflicts=True,
+        unique_fields=['tmdb_id'],
+        update_fields=['directors', 'cast', 'updated_at']
+    )
+
+def _store_late_credits(movie_id, future):
+    # Arama süresinden sonra gelen sonuç (credits thread'inde çalışır)
+    if future.cancelled() or future.exception() is not None:
+        return
+    credits = future.result()
+    if credits is not None:
+        try:
+            _run_with_db(_store_movie_credits, {movie_id: credits})
+        except Exception:
+            logger.exception("Geç gelen oyuncu bilgisi kaydedilemedi (%s)", movie_id)
+
+def enrich_movies_with_credits(movies, deadline=None):
+    # Yönetmen/oyuncu bilgisi önce MovieCredits tablosundan tek sorguda okunur,
+    # sadece eksik veya süresi dolmuş kayıtlar için TMDB'ye gidilir.
+    ids = [movie['id'] for movie in movies]
+    fresh_after = timezone.now() - timedelta(days=getattr(settings, 'CREDITS_REFRESH_DAYS', 30))
+    stored = {c.tmdb_id: c for c in MovieCredits.objects.filter(tmdb_id__in=ids)}
+    missing = [movie_id for movie_id in ids if movie_id not in stored or stored[movie_id].updated_at < fresh_after]
+
+    fetched = {}
+    if missing:
+        future_to_id = {_credits_executor.submit(get_movie_credits, movie_id): movie_id for movie_id in missing}
+        # Yetişmeyenler eski kayıtla (varsa) ya da boş gösterilir, arama beklemez
+        try:
+            credits_timeout = getattr(settings, 'CREDITS_TIMEOUT', 2)
+            if deadline is not None:
+                credits_timeout = min(credits_timeout, _remaining(deadline))
+            for future in as_completed(future_to_id, timeout=credits_timeout):
+                credits = future.result()
+                if credits is not None:
+                    fetched[future_to_id[future]] = credits
+        except TimeoutError:
+            # Başlamamış işler iptal edilir (havuz kuyruğu birikmez); zaten
+            # çalışanların sonucu bitince kaydedilir, aynı film tekrar sorgulanmaz
+            for future, movie_id in future_to_id.items():
+                if future.done():
+                    # Zaman aşımıyla aynı anda bitenler de kullanılır
+                    if movie_id not in fetched and future.exception() is None and future.result() is not None:
+                        fetched[movie_id] = future.result()
+                elif not future.cancel():
+                    future.add_done_callback(lambda done, movie_id=movie_id: _store_late_credits(movie_id, done))
+
+    if fetched:
+        _store_movie_credits(fetched)
+
+    for movie in movies:
+        credits = fetched.get(movie['id'])
+        if credits is None and movie['id'] in stored:
+            credits = {'directors': stored[movie['id']].directors, 'cast': stored[movie['id']].cast}
+        movie['director'] = credits['directors'] if credits else ""
+        movie['cast'] = credits['cast'] if credits else []
+    return movies
+
+def search_users(query, deadline=None):
+    return search_local_users(query)
+
+def search_content_service(query, timeout=None):
+    # Dört kaynak aynı anda sorgulanır; kalan süre upstream isteklerine de
+    # iletilir, böylece geç kalan iş havuzda deadline'dan uzun yaşamaz.
+    # Yetişmeyen kaynaklar 'timed_out', hata veren veya hiç başlayamayanlar
+    # 'failed' listesinde belirtilir.
+    if timeout is None:
+        timeout = getattr(settings, 'SEARCH_TIMEOUT', 4)
+    deadline = time.monotonic() + timeout
+
+    sources = {
+        'movies': search_movies_with_local,
+        'books': search_books_with_local,
+        'tv_series': search_tv_series_with_local,
+        'users': search_users,
+    }
+    futures = {
+        _search_executor.submit(_run_with_db, func, query, deadline=deadline): name
+        for name, func in sources.items()
+    }
+    done, _ = wait(futures, timeout=timeout)
+
+    results = {'timed_out': [], 'failed': []}
+    for future, name in futures.items():
+        results[name] = []
+        if future in done:
+            try:
+                results[name] = future.result()
+            except Exception:
+                logger.exception("Arama kaynağı hata verdi: %s", name)
+                results['failed'].append(name)
+        elif future.cancel():
+            # Havuz dolu olduğu için hiç başlayamadı
+            logger.warning("Arama kaynağı havuzda beklerken iptal edildi: %s", name)
+            results['failed'].append(name)
+        else:
+            # Geç kalan istek en fazla kalan süre kadar sürer ve upstream önbelleğini doldurur
+            results['timed_out'].append(name)
+
+    results['partial'] = bool(results['timed_out'] or results['failed'])
+    return results
+
+def _search_local_first(query, local_search, upstream_search, id_key, deadline=None):
+    # Önce yerel katalog indeksi; yeterli sonuç yoksa eksik kalan kısım upstream'den
+    local_results = local_search(query)
+    if len(local_results) >= getattr(settings, 'LOCAL_SEARCH_MIN_RESULTS', 5):
+        return local_results
+    seen = {item[id_key] for item in local_results}
+    return local_results + [item for item in upstream_search(query, deadline=deadline) if item.get(id_key) not in seen]
+
+def search_movies_with_local(query, deadline=None):
+    def local(q):
+        # Yerel sonuçlar da yönetmen/oyuncu bilgisiyle zenginleştirilir
+        return enrich_movies_with_credits(search_local_movies(q), deadline=deadline)
+    return _search_local_first(query, local, search_movies, 'id', deadline)
+
+def search_tv_series_with_local(query, deadline=None):
+    return _search_local_first(query, search_local_tv_series, search_tv_series, 'id', deadline)
+
+def search_books_with_local(query, deadline=None):
+    return _search_local_first(query, search_local_books, search_books, 'google_id', deadline)
+
+def search_movies(query, deadline=None):
     if not query: return []
     url = f"{TMDB_URL}/search/movie"
     params = {'api_key': TMDB_API_KEY, 'query': query, 'language': 'tr-TR'}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            results = response.json().get('results', [])
+        data = get_json(url, params, timeout=_remaining(deadline))
+        if data is not None:
+            results = data.get('results', [])
             
             top_results = results[:10]
             remaining_results = results[10:]
             
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                future_to_movie = {executor.submit(get_movie_director, movie['id']): movie for movie in top_results}
-                
-                for future in as_completed(future_to_movie):
-                    movie = future_to_movie[future]
-                    try:
-                        movie['director'] = future.result()
-                    except:
-                        movie['director'] = ""
+            enrich_movies_with_credits(top_results, deadline=deadline)
             
             return top_results + remaining_results
         return []
     except: return []
 
-def search_books(query):
+def search_books(query, deadline=None):
     if not query: return []
     params = {'q': query, 'maxResults': 40}
     
     try:
-        response = requests.get(GOOGLE_BOOKS_URL, params=params)
-        if response.status_code == 200:
-            items = response.json().get('items', [])
+        data = get_json(GOOGLE_BOOKS_URL, params, timeout=_remaining(deadline))
+        if data is not None:
+            items = data.get('items', [])
             cleaned_books = []
             
             for item in items:
@@ -105,9 +244,9 @@ def get_movie_detail_service(tmdb_id):
         'append_to_response': 'credits'
     }
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json()
+        data = get_json(url, params)
+        if data is not None:
+            return data
     except Exception as e:
         print(f"Hata: {e}")
     return None
@@ -115,18 +254,53 @@ def get_movie_detail_service(tmdb_id):
 def get_book_detail_service(google_id):
     url = f"{GOOGLE_BOOKS_URL}/{google_id}"
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
+        data = get_json(url)
+        if data is not None:
+            return data
     except Exception as e:
         print(f"Kitap Hatası: {e}")
     return None
 
+# --- YEREL DETAY KOPYALARI (SNAPSHOT) ---
+
+def _refresh_snapshot(model, pk, fetch):
+    data = fetch()
+    if data:
+        model.objects.filter(pk=pk).update(detail_payload=data, detail_updated_at=timezone.now())
+
+def _get_detail_with_snapshot(model, lookup, fetch):
+    # Yerel kayıtta detay kopyası varsa sayfa veritabanından sunulur; kopya
+    # eskiyse arka planda yenilenir. Kopya yoksa upstream'den çekilip saklanır.
+    obj = model.objects.filter(**lookup).first()
+    if obj and obj.detail_payload:
+        max_age = timedelta(hours=getattr(settings, 'DETAIL_SNAPSHOT_MAX_AGE_HOURS', 24))
+        if not obj.detail_updated_at or obj.detail_updated_at < timezone.now() - max_age:
+            # Aynı kayıt için (workerlar arası da) tek bir yenileme
+            if cache.add(f"snapshot:{model.__name__}:{obj.pk}", 1, timeout=300):
+                _snapshot_executor.submit(_run_with_db, _refresh_snapshot, model, obj.pk, fetch)
+        return obj.detail_payload, obj
+
+    data = fetch()
+    if data and obj:
+        obj.detail_payload = data
+        obj.detail_updated_at = timezone.now()
+        obj.save(update_fields=['detail_payload', 'detail_updated_at'])
+    return data, obj
+
+def get_movie_detail_snapshot(tmdb_id):
+    return _get_detail_with_snapshot(Movie, {'tmdb_id': tmdb_id}, lambda: get_movie_detail_service(tmdb_id))
+
+def get_tv_series_detail_snapshot(tmdb_id):
+    return _get_detail_with_snapshot(TVSeries, {'tmdb_id': tmdb_id}, lambda: get_tv_series_detail_service(tmdb_id))
+
+def get_book_detail_snapshot(google_id):
+    return _get_detail_with_snapshot(Book, {'google_id': google_id}, lambda: get_book_detail_service(google_id))
+
 def _fetch_tmdb_movies(url, params):
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            results = response.json().get('results', [])
+        data = get_json(url, params)
+        if data is not None:
+            results = data.get('results', [])
             for m in results:
                 if m.get('poster_path'):
                     m['image'] = f"https://image.tmdb.org/t/p/w500{m['poster_path']}"
@@ -150,9 +324,9 @@ def get_movie_genres():
     url = f"{TMDB_URL}/genre/movie/list"
     params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR'}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('genres', [])
+        data = get_json(url, params)
+        if data is not None:
+            return data.get('genres', [])
     except:
         pass
     return []
@@ -194,14 +368,14 @@ def get_books_by_category(query):
 
 # --- TV SERIES SERVICES ---
 
-def search_tv_series(query):
+def search_tv_series(query, deadline=None):
     if not query: return []
     url = f"{TMDB_URL}/search/tv"
     params = {'api_key': TMDB_API_KEY, 'query': query, 'language': 'tr-TR'}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('results', [])
+        data = get_json(url, params, timeout=_remaining(deadline))
+        if data is not None:
+            return data.get('results', [])
         return []
     except: return []
 
@@ -209,9 +383,9 @@ def get_popular_tv_series(page=1):
     url = f"{TMDB_URL}/tv/popular"
     params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR', 'page': page}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('results', [])
+        data = get_json(url, params)
+        if data is not None:
+            return data.get('results', [])
         return []
     except: return []
 
@@ -219,9 +393,9 @@ def get_top_rated_tv_series(page=1):
     url = f"{TMDB_URL}/tv/top_rated"
     params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR', 'page': page}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('results', [])
+        data = get_json(url, params)
+        if data is not None:
+            return data.get('results', [])
         return []
     except: return []
 
@@ -229,9 +403,9 @@ def get_tv_series_detail_service(tv_id):
     url = f"{TMDB_URL}/tv/{tv_id}"
     params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR', 'append_to_response': 'credits,videos,similar'}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json()
+        data = get_json(url, params)
+        if data is not None:
+            return data
         return None
     except: return None
 
@@ -239,9 +413,9 @@ def get_tv_genres():
     url = f"{TMDB_URL}/genre/tv/list"
     params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR'}
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('genres', [])
+        data = get_json(url, params)
+        if data is not None:
+            return data.get('genres', [])
     except:
         pass
     return []
@@ -255,8 +429,37 @@ def get_tv_series_by_genre(genre_id):
         'sort_by': 'popularity.desc'
     }
     try:
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            return response.json().get('results', [])
+        data = get_json(url, params)
+        if data is not None:
+            return data.get('results', [])
         return []
     except: return []
+
+# --- TOPLU AKTARIM (INGESTION) ---
+
+def iter_tmdb_pages(path, extra_params=None, start_page=1, max_pages=500):
+    # TMDB listelerini sayfa sayfa (sayfa_no, sonuçlar) olarak döner.
+    # Tek seferlik okuma olduğu için cevaplar önbelleğe alınmaz (ttl=0).
+    url = f"{TMDB_URL}/{path}"
+    page = start_page
+    total_pages = max_pages
+    while page <= min(total_pages, max_pages):
+        params = {'api_key': TMDB_API_KEY, 'language': 'tr-TR', 'page': page, **(extra_params or {})}
+        data = get_json(url, params, ttl=0)
+        if not data:
+            return
+        total_pages = data.get('total_pages', page)
+        yield page, data.get('results', [])
+        page += 1
+
+def iter_google_books_pages(query, start_index=0, max_items=1000, page_size=40):
+    # Google Books sonuçlarını (başlangıç_indeksi, kitaplar) olarak döner
+    start = start_index
+    while start < max_items:
+        params = {'q': query, 'maxResults': page_size, 'startIndex': start}
+        data = get_json(GOOGLE_BOOKS_URL, params, ttl=0)
+        items = data.get('items', []) if data else []
+        if not items:
+            return
+        yield start, items
+        start += page_size
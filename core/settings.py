@@ -24,6 +24,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',       
     'corsheaders',          
@@ -119,4 +120,86 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
-LOGOUT_REDIRECT_URL = 'login'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'
+
+# Upstream (TMDB / Google Books) HTTP istemcisi ve cevap önbelleği
+UPSTREAM_TIMEOUT = int(os.getenv('UPSTREAM_TIMEOUT', 10))
+UPSTREAM_POOL_MAXSIZE = int(os.getenv('UPSTREAM_POOL_MAXSIZE', 20))
+UPSTREAM_CACHE_TTL = int(os.getenv('UPSTREAM_CACHE_TTL', 300))
+UPSTREAM_CACHE_MAXSIZE = int(os.getenv('UPSTREAM_CACHE_MAXSIZE', 1024))
+
+# Arama: tüm kaynaklar için toplam süre sınırı (saniye)
+SEARCH_TIMEOUT = float(os.getenv('SEARCH_TIMEOUT', 4))
+# Arama thread havuzu: her arama 4 iş gönderir (eşzamanlı arama sayısı × 4)
+SEARCH_MAX_WORKERS = int(os.getenv('SEARCH_MAX_WORKERS', 64))
+CREDITS_TIMEOUT = float(os.getenv('CREDITS_TIMEOUT', 2))
+# Yönetmen/oyuncu bilgisinin (MovieCredits) yenilenme süresi (gün)
+CREDITS_REFRESH_DAYS = int(os.getenv('CREDITS_REFRESH_DAYS', 30))
+
+# Önbellek (çoklu worker için ör. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Keşfet vitrini: taze kalma süresi ve bayat değerin sunulabileceği ek süre (saniye)
+SHOWCASE_TTL = int(os.getenv('SHOWCASE_TTL', 600))
+SHOWCASE_STALE_TTL = int(os.getenv('SHOWCASE_STALE_TTL', 86400))
+
+# Aynı upstream isteğini workerlar arasında da birleştirmek için paylaşılan
+# önbellekte kilit kullan (CACHES ortak bir backend olmalı, ör. Redis)
+UPSTREAM_SHARED_LOCK = os.getenv('UPSTREAM_SHARED_LOCK', 'False') == 'True'
+
+# Detay sayfası kopyalarının (detail_payload) arka planda yenilenme yaşı (saat)
+DETAIL_SNAPSHOT_MAX_AGE_HOURS = int(os.getenv('DETAIL_SNAPSHOT_MAX_AGE_HOURS', 24))
+
+# Yerel katalog araması bu kadar sonuç bulursa upstream'e gidilmez
+LOCAL_SEARCH_MIN_RESULTS = int(os.getenv('LOCAL_SEARCH_MIN_RESULTS', 5))
+
+# Arama önerisi indeksi (core/suggest.py): yeni kayıtların arka planda eklenme
+# aralığı ve indeksin baştan kurulma aralığı (saniye)
+SUGGEST_INDEX_MAX_AGE = int(os.getenv('SUGGEST_INDEX_MAX_AGE', 600))
+SUGGEST_INDEX_FULL_REBUILD = int(os.getenv('SUGGEST_INDEX_FULL_REBUILD', 86400))
+
+# Zaman tüneli: bu kadar takipçiden fazlası olan hesapların aktiviteleri
+# takipçilere dağıtılmaz, okuma sırasında eklenir
+TIMELINE_FANOUT_LIMIT = int(os.getenv('TIMELINE_FANOUT_LIMIT', 5000))
+# Yeni takipte zaman tüneline eklenecek geçmiş aktivite sayısı
+TIMELINE_BACKFILL_SIZE = int(os.getenv('TIMELINE_BACKFILL_SIZE', 200))
+
+# Akış kartı gövdelerinin önbellekte kalma süresi (saniye); sürüm değişince
+# zaten geçersiz olur, bu süre "... önce" ifadelerinin eskime sınırıdır
+FEED_CARD_CACHE_TTL = int(os.getenv('FEED_CARD_CACHE_TTL', 300))
+
+# Anlık olaylar (/events/, Server-Sent Events) sadece ASGI sunucusuyla çalışır
+# (ör. uvicorn core.asgi:application). WSGI altında (runserver, gunicorn) her
+# bağlantı bir worker'ı süresiz meşgul edeceği için varsayılan olarak kapalıdır.
+REALTIME_ENABLED = os.getenv('REALTIME_ENABLED', 'False') == 'True'
+# Anlık olaylar (core/realtime.py): varsayılan süreç içi aracı sadece tek worker
+# süreciyle çalışır. Birden fazla worker varsa (aynı makinede bile)
+# REALTIME_BROKER=core.realtime.RedisBroker ve REALTIME_REDIS_URL ayarlanmalı
+REALTIME_BROKER = os.getenv('REALTIME_BROKER', 'core.realtime.InProcessBroker')
+REALTIME_REDIS_URL = os.getenv('REALTIME_REDIS_URL')
+# SSE bağlantılarında ping aralığı (saniye)
+REALTIME_HEARTBEAT = int(os.getenv('REALTIME_HEARTBEAT', 25))
+
+# En çok beğenilenler sıralaması (core/rankings.py): liste başına içerik sayısı,
+# anlık görüntünün yenilenme yaşı (saniye), Bayes ortalamasındaki ön oy sayısı
+# ve artımlı yenilemenin üstünde tam yenilemeye geçilen değişmiş içerik sayısı
+RANKING_SIZE = int(os.getenv('RANKING_SIZE', 100))
+RANKING_TTL = int(os.getenv('RANKING_TTL', 3600))
+RANKING_PRIOR_VOTES = int(os.getenv('RANKING_PRIOR_VOTES', 5))
+RANKING_INCREMENTAL_LIMIT = int(os.getenv('RANKING_INCREMENTAL_LIMIT', 500))
+
+# Üyeler sayfasındaki popüler inceleme/aktivite sıralamalarının önbellek süresi (saniye)
+MEMBERS_POPULAR_TTL = int(os.getenv('MEMBERS_POPULAR_TTL', 300))
+
+# Okunmamış bildirim sayısı ve son bildirimler önbelleğinin en uzun ömrü (saniye)
+NOTIFICATION_SUMMARY_TTL = int(os.getenv('NOTIFICATION_SUMMARY_TTL', 3600))
+
+# Aynı gönderi için beğeni/yorum/takip bildirimlerinin tek satırda toplandığı pencere (saniye)
+NOTIFICATION_GROUP_WINDOW = int(os.getenv('NOTIFICATION_GROUP_WINDOW', 21600))
+# Okunmuş bildirimlerin ana tabloda kalma süresi (gün), bkz. archive_notifications
+NOTIFICATION_RETENTION_DAYS = int(os.getenv('NOTIFICATION_RETENTION_DAYS', 90))
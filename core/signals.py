@@ -1,34 +1,289 @@
-from django.db.models.signals import post_save, m2m_changed
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
 from django.dispatch import receiver
-from .models import ActivityLike, ActivityComment, Profile, Notification
+from django.contrib.auth.models import User
+from .models import (
+    ActivityLike, ActivityComment, Profile, Notification, Movie, TVSeries, Book, Activity, TimelineEntry, Rating, Review,
+    MemberStats, UserList
+)
+from .feed import bump_card_versions
+from .counters import adjust_counter
+from .ratings import apply_rating_change
+from .members import record_activity, forget_activity
+from .lists import refresh_list_previews, refresh_like_counts
+from .notifications import notify, notify_many, retract, announce_new, invalidate_unread_summary
+from .timeline import fan_out_activity, touch_activity, backfill_timeline, purge_timeline, mark_timelines_written
+from .suggest import (
+    index_item, unindex_item, movie_suggestion, tv_suggestion, book_suggestion, user_suggestion
+)
+
+# --- Bildirimler (gruplanarak yazılır, bkz. core/notifications.py) ---
 
 @receiver(post_save, sender=ActivityLike)
 def create_like_notification(sender, instance, created, **kwargs):
-    if created and instance.user != instance.activity.user:
-        Notification.objects.create(
-            recipient=instance.activity.user,
-            sender=instance.user,
-            notification_type='LIKE',
-            activity=instance.activity
-        )
+    if created:
+        notify(instance.activity.user_id, instance.user_id, 'LIKE', instance.activity_id)
+
+@receiver(post_delete, sender=ActivityLike)
+def retract_like_notification(sender, instance, **kwargs):
+    try:
+        recipient_id = instance.activity.user_id
+    except Activity.DoesNotExist:
+        # Aktivite silinirken; bildirimleri de siliniyor
+        return
+    retract(recipient_id, instance.user_id, 'LIKE', instance.activity_id)
 
 @receiver(post_save, sender=ActivityComment)
 def create_comment_notification(sender, instance, created, **kwargs):
-    if created and instance.user != instance.activity.user:
-        Notification.objects.create(
-            recipient=instance.activity.user,
-            sender=instance.user,
-            notification_type='COMMENT',
-            activity=instance.activity
-        )
+    if created:
+        notify(instance.activity.user_id, instance.user_id, 'COMMENT', instance.activity_id)
+
+@receiver(m2m_changed, sender=Profile.following.through)
+def create_follow_notification(sender, instance, action, reverse, pk_set, **kwargs):
+    if action != 'post_add' or not pk_set:
+        return
+    other_user_ids = Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+    if reverse:
+        # followed_profile.followers.add(...): instance takip edilen taraf
+        events = [(instance.user_id, follower_id, 'FOLLOW', None) for follower_id in other_user_ids]
+    else:
+        events = [(followed_id, instance.user_id, 'FOLLOW', None) for followed_id in other_user_ids]
+    notify_many(events)
+
+
+# --- Aktivite etkileşim sayaçları (like_count, comment_count, share_count) ---
+
+@receiver(post_save, sender=ActivityLike)
+def increment_like_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(instance.activity_id, 'like_count', 1)
+
+@receiver(post_delete, sender=ActivityLike)
+def decrement_like_count(sender, instance, **kwargs):
+    adjust_counter(instance.activity_id, 'like_count', -1)
+
+@receiver(post_save, sender=ActivityComment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        adjust_counter(instance.activity_id, 'comment_count', 1)
+
+@receiver(post_delete, sender=ActivityComment)
+def decrement_comment_count(sender, instance, **kwargs):
+    adjust_counter(instance.activity_id, 'comment_count', -1)
+
+@receiver(post_save, sender=Activity)
+def increment_share_count(sender, instance, created, **kwargs):
+    if created and instance.action_type == 'SHARED' and instance.original_activity_id:
+        adjust_counter(instance.original_activity_id, 'share_count', 1)
+
+@receiver(post_delete, sender=Activity)
+def decrement_share_count(sender, instance, **kwargs):
+    if instance.action_type == 'SHARED' and instance.original_activity_id:
+        adjust_counter(instance.original_activity_id, 'share_count', -1)
+
+
+# --- İçerik puan özetleri (rating_sum, rating_count, rating_avg, rating_histogram) ---
+
+@receiver(post_save, sender=Rating)
+def update_rating_summary(sender, instance, created, **kwargs):
+    old_score = None if created else getattr(instance, '_loaded_score', None)
+    apply_rating_change(instance, old_score, instance.score)
+    instance._loaded_score = instance.score
+
+@receiver(post_delete, sender=Rating)
+def remove_from_rating_summary(sender, instance, **kwargs):
+    apply_rating_change(instance, getattr(instance, '_loaded_score', None) or instance.score, None)
+
+
+@receiver(post_save, sender=Notification)
+def update_unread_summary(sender, instance, created, **kwargs):
+    # Okunmamış bildirim sayısı/son bildirimler önbelleği (core/notifications.py)
+    # Toplu yazımlar (notify_many) signal tetiklemez, orada doğrudan yapılır
+    if created and not instance.is_read:
+        announce_new([instance])
+    elif not created:
+        invalidate_unread_summary(instance.recipient_id)
+
+@receiver(post_delete, sender=Notification)
+def remove_from_unread_summary(sender, instance, **kwargs):
+    if not instance.is_read:
+        invalidate_unread_summary(instance.recipient_id)
+
+
+# --- Zaman tüneli (fan-out-on-write) ---
+
+@receiver(post_save, sender=Activity)
+def fan_out_activity_to_timelines(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: fan_out_activity(instance))
+    else:
+        touch_activity(instance)
 
 @receiver(m2m_changed, sender=Profile.following.through)
-def create_follow_notification(sender, instance, action, pk_set, **kwargs):
-    if action == 'post_add':
-        for pk in pk_set:
-            followed_profile = Profile.objects.get(pk=pk)
-            Notification.objects.create(
-                recipient=followed_profile.user,
-                sender=instance.user,
-                notification_type='FOLLOW'
-            )
+def sync_timeline_on_follow(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and not reverse:
+        TimelineEntry.objects.filter(owner_id=instance.user_id).delete()
+        mark_timelines_written([instance.user_id])
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+
+    other_user_ids = Profile.objects.filter(pk__in=pk_set).values_list('user_id', flat=True)
+    if reverse:
+        # followed_profile.followers.add/remove(...): instance takip edilen taraf
+        pairs = [(follower_id, instance.user_id) for follower_id in other_user_ids]
+    else:
+        pairs = [(instance.user_id, followed_id) for followed_id in other_user_ids]
+
+    for owner_id, followed_id in pairs:
+        if action == 'post_add':
+            backfill_timeline(owner_id, followed_id)
+        else:
+            purge_timeline(owner_id, followed_id)
+
+# --- Üyeler sayfası özeti (MemberStats) ---
+
+@receiver(post_save, sender=User)
+def create_member_stats(sender, instance, created, **kwargs):
+    if created:
+        MemberStats.objects.get_or_create(user=instance)
+
+@receiver(post_save, sender=Activity)
+def record_member_activity(sender, instance, created, **kwargs):
+    if created:
+        record_activity(instance)
+
+@receiver(post_delete, sender=Activity)
+def forget_member_activity(sender, instance, **kwargs):
+    forget_activity(instance)
+
+# --- Liste sayfası özeti (UserList.preview_images, like_count) ---
+
+def _remember_cleared_lists(sender, instance, reverse):
+    # Ters yönde clear() (movie.lists.clear()) post_clear'da pk_set vermez:
+    # etkilenen listeler ara tablodan okunup post_clear'a kadar saklanır
+    if not reverse:
+        return
+    source = next(
+        field.name for field in sender._meta.get_fields()
+        if field.is_relation and field.related_model is type(instance)
+    )
+    cleared = getattr(instance, '_cleared_list_ids', {})
+    cleared[sender] = list(sender.objects.filter(**{source: instance}).values_list('userlist_id', flat=True))
+    instance._cleared_list_ids = cleared
+
+def _changed_list_ids(sender, instance, action, reverse, pk_set):
+    # list.movies.add(...) veya movie.lists.add(...) her iki yönden de gelebilir
+    if not reverse:
+        return [instance.pk]
+    if action == 'post_clear':
+        return getattr(instance, '_cleared_list_ids', {}).pop(sender, [])
+    return list(pk_set or ())
+
+@receiver(m2m_changed, sender=UserList.movies.through)
+@receiver(m2m_changed, sender=UserList.tv_series.through)
+@receiver(m2m_changed, sender=UserList.books.through)
+def update_list_previews(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        _remember_cleared_lists(sender, instance, reverse)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        refresh_list_previews(_changed_list_ids(sender, instance, action, reverse, pk_set))
+
+@receiver(m2m_changed, sender=UserList.likes.through)
+def update_list_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        _remember_cleared_lists(sender, instance, reverse)
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        refresh_like_counts(_changed_list_ids(sender, instance, action, reverse, pk_set))
+
+# --- Arama önerisi (typeahead) indeksinin güncel tutulması ---
+
+def _title_changed(update_fields, field='title'):
+    # Sadece başka alanlar güncellendiyse (ör. detail_payload, last_login) indekse dokunma
+    return not update_fields or field in update_fields
+
+@receiver(post_save, sender=Movie)
+def index_movie_suggestion(sender, instance, update_fields=None, **kwargs):
+    if _title_changed(update_fields):
+        index_item(*movie_suggestion(instance))
+
+@receiver(post_save, sender=TVSeries)
+def index_tv_suggestion(sender, instance, update_fields=None, **kwargs):
+    if _title_changed(update_fields):
+        index_item(*tv_suggestion(instance))
+
+@receiver(post_save, sender=Book)
+def index_book_suggestion(sender, instance, update_fields=None, **kwargs):
+    if _title_changed(update_fields):
+        index_item(*book_suggestion(instance))
+
+@receiver(post_save, sender=User)
+def index_user_suggestion(sender, instance, update_fields=None, **kwargs):
+    if not _title_changed(update_fields, 'username'):
+        return
+    if instance.is_superuser:
+        unindex_item(f"user:{instance.pk}")
+    else:
+        profile = Profile.objects.filter(user=instance).first()
+        index_item(*user_suggestion(instance, profile.avatar.url if profile and profile.avatar else None))
+
+@receiver(post_save, sender=Profile)
+def index_profile_suggestion(sender, instance, **kwargs):
+    if not instance.user.is_superuser:
+        index_item(*user_suggestion(instance.user, instance.avatar.url if instance.avatar else None))
+
+@receiver(post_delete, sender=Movie)
+def unindex_movie_suggestion(sender, instance, **kwargs):
+    unindex_item(f"movie:{instance.tmdb_id}")
+
+@receiver(post_delete, sender=TVSeries)
+def unindex_tv_suggestion(sender, instance, **kwargs):
+    unindex_item(f"tv:{instance.tmdb_id}")
+
+@receiver(post_delete, sender=Book)
+def unindex_book_suggestion(sender, instance, **kwargs):
+    unindex_item(f"book:{instance.google_id}")
+
+@receiver(post_delete, sender=User)
+def unindex_user_suggestion(sender, instance, **kwargs):
+    unindex_item(f"user:{instance.pk}")
+
+# --- Akış kartı parçalarının önbellek sürümleri (core/feed.py) ---
+
+def _bump_cards_referencing(field, instance):
+    # İçeriği doğrudan veya paylaşılan orijinal üzerinden gösteren kartlar
+    activity_ids = Activity.objects.filter(
+        Q(**{field: instance}) | Q(**{f"original_activity__{field}": instance})
+    ).values_list('id', flat=True)
+    bump_card_versions(activity_ids)
+
+@receiver(post_save, sender=ActivityComment)
+@receiver(post_delete, sender=ActivityComment)
+def bump_card_on_comment(sender, instance, **kwargs):
+    bump_card_versions([instance.activity_id])
+
+@receiver(post_save, sender=Activity)
+def bump_card_on_activity_update(sender, instance, created, **kwargs):
+    if not created:
+        bump_card_versions([instance.id])
+
+@receiver(post_save, sender=Rating)
+def bump_cards_on_rating_update(sender, instance, created, **kwargs):
+    # Yeni puanı henüz hiçbir kart göstermiyor
+    if not created:
+        _bump_cards_referencing('related_rating', instance)
+
+@receiver(post_save, sender=Review)
+def bump_cards_on_review_update(sender, instance, created, **kwargs):
+    if not created:
+        _bump_cards_referencing('related_review', instance)
+
+@receiver(pre_delete, sender=Rating)
+def bump_cards_on_rating_delete(sender, instance, **kwargs):
+    # Silme sonrası ilişki NULL olacağı için kartlar önceden bulunur
+    _bump_cards_referencing('related_rating', instance)
+
+@receiver(pre_delete, sender=Review)
+def bump_cards_on_review_delete(sender, instance, **kwargs):
+    _bump_cards_referencing('related_review', instance)
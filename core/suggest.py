@@ -0,0 +1,250 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+
+from .models import Movie, TVSeries, Book
+from .search import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class PrefixIndex:
+    """
+    Arama kutusu önerileri için bellek içi önek indeksi.
+    Her başlığın her kelime başlangıcı sıralı bir listede tutulur;
+    önek araması bisect ile yapılır (istek başına veritabanı erişimi yok).
+    """
+
+    def __init__(self):
+        self._keys = []      # sıralı (anahtar, öğe_kimliği) çiftleri
+        self._items = {}     # öğe_kimliği -> öneri sözlüğü
+        self._item_keys = {}  # öğe_kimliği -> indekslenen anahtarlar
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _keys_for(title):
+        # "The Dark Knight" -> "the dark knight", "dark knight", "knight"
+        words = normalize_text(title).split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def load(self, items):
+        keys, item_map, item_keys = [], {}, {}
+        for item_id, item in items:
+            item_map[item_id] = item
+            item_keys[item_id] = self._keys_for(item['title'])
+            keys.extend((key, item_id) for key in item_keys[item_id])
+        keys.sort()
+        with self._lock:
+            self._keys, self._items, self._item_keys = keys, item_map, item_keys
+
+    def add(self, item_id, item):
+        with self._lock:
+            self._remove(item_id)
+            self._items[item_id] = item
+            self._item_keys[item_id] = self._keys_for(item['title'])
+            for key in self._item_keys[item_id]:
+                bisect.insort(self._keys, (key, item_id))
+
+    def add_many(self, items):
+        """
+        Toplu ekleme/güncelleme (aktarım sonrası yenileme). Her öğe için
+        insort O(n) olduğundan, yeni anahtarlar ayrıca sıralanıp mevcut
+        listeyle tek geçişte birleştirilir: O(n + k log k).
+        """
+        new_items = {item_id: (item, self._keys_for(item['title'])) for item_id, item in items}
+        if not new_items:
+            return
+        new_keys = sorted((key, item_id) for item_id, (item, keys) in new_items.items() for key in keys)
+        with self._lock:
+            stale = {
+                (key, item_id) for item_id in new_items
+                for key in self._item_keys.get(item_id, ())
+            }
+            kept = (entry for entry in self._keys if entry not in stale) if stale else self._keys
+            self._keys = list(heapq.merge(kept, new_keys))
+            for item_id, (item, keys) in new_items.items():
+                self._items[item_id] = item
+                self._item_keys[item_id] = keys
+
+    def remove(self, item_id):
+        with self._lock:
+            self._remove(item_id)
+
+    def _remove(self, item_id):
+        for key in self._item_keys.pop(item_id, []):
+            pos = bisect.bisect_left(self._keys, (key, item_id))
+            if pos < len(self._keys) and self._keys[pos] == (key, item_id):
+                del self._keys[pos]
+        self._items.pop(item_id, None)
+
+    def search(self, prefix, limit=8):
+        prefix = normalize_text(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            keys, items = self._keys, self._items
+            pos = bisect.bisect_left(keys, (prefix, ''))
+            candidates = {}
+            # Sıralama için sınırlı sayıda aday toplanır
+            while pos < len(keys) and len(candidates) < limit * 5:
+                key, item_id = keys[pos]
+                if not key.startswith(prefix):
+                    break
+                if item_id not in candidates and item_id in items:
+                    candidates[item_id] = normalize_text(items[item_id]['title']).startswith(prefix)
+                pos += 1
+            # Başlığın başından eşleşenler ve kısa başlıklar önce
+            ranked = sorted(candidates, key=lambda i: (not candidates[i], len(items[i]['title'])))
+            return [items[i] for i in ranked[:limit]]
+
+    def __len__(self):
+        return len(self._items)
+
+
+# --- Öneri sözlükleri ---
+
+def movie_suggestion(movie):
+    return f"movie:{movie.tmdb_id}", {
+        'type': 'movie',
+        'id': movie.tmdb_id,
+        'title': movie.title,
+        'image': f"https://image.tmdb.org/t/p/w92{movie.poster_path}" if movie.poster_path else None,
+        'subtitle': movie.release_date.strftime('%Y') if movie.release_date else 'Film',
+    }
+
+
+def tv_suggestion(tv):
+    return f"tv:{tv.tmdb_id}", {
+        'type': 'tv',
+        'id': tv.tmdb_id,
+        'title': tv.title,
+        'image': f"https://image.tmdb.org/t/p/w92{tv.poster_path}" if tv.poster_path else None,
+        'subtitle': f"Dizi | {tv.first_air_date.year}" if tv.first_air_date else 'Dizi',
+    }
+
+
+def book_suggestion(book):
+    return f"book:{book.google_id}", {
+        'type': 'book',
+        'id': book.google_id,
+        'title': book.title,
+        'image': book.cover_path or None,
+        'subtitle': book.authors,
+    }
+
+
+def user_suggestion(user, avatar_url=None):
+    return f"user:{user.pk}", {
+        'type': 'user',
+        'id': user.pk,
+        'username': user.username,
+        'title': user.username,
+        'image': avatar_url or '/media/avatars/usericon.png',
+        'subtitle': 'Kullanıcı',
+    }
+
+
+def _user_item(user):
+    profile = getattr(user, 'profile', None)
+    return user_suggestion(user, profile.avatar.url if profile and profile.avatar else None)
+
+
+def _catalog_sources():
+    # Kaynak adı -> (sorgu, öneri fonksiyonu)
+    return {
+        'movie': (Movie.objects.only('tmdb_id', 'title', 'poster_path', 'release_date'), movie_suggestion),
+        'tv': (TVSeries.objects.only('tmdb_id', 'title', 'poster_path', 'first_air_date'), tv_suggestion),
+        'book': (Book.objects.only('google_id', 'title', 'cover_path', 'authors'), book_suggestion),
+        'user': (
+            User.objects.filter(is_superuser=False).select_related('profile').only('username', 'profile__avatar'),
+            _user_item,
+        ),
+    }
+
+
+def _iter_catalog(since, watermarks):
+    # since: kaynak başına son görülen id; sadece ondan yeni kayıtlar okunur.
+    # Okunan en büyük id'ler watermarks'a yazılır.
+    for name, (queryset, to_item) in _catalog_sources().items():
+        watermarks.setdefault(name, since.get(name, 0))
+        for obj in queryset.filter(pk__gt=since.get(name, 0)).order_by('pk').iterator(chunk_size=5000):
+            watermarks[name] = obj.pk
+            yield to_item(obj)
+
+
+# --- Süreç içi tekil indeks ---
+# İndeks istek yolunda kurulmaz: süreç başında (wsgi.py/asgi.py) veya ilk
+# istekte başlayan arka plan thread'i önce tam kurar, sonra her
+# SUGGEST_INDEX_MAX_AGE saniyede sadece yeni eklenen kayıtları (id > son görülen)
+# ekler. Başka workerlarda değişen/silinen kayıtlar periyodik tam kurulumla düzelir.
+
+suggest_index = PrefixIndex()
+_built_at = None
+_watermarks = {}
+_maintainer = None
+_maintainer_lock = threading.Lock()
+
+
+def rebuild_index():
+    global _built_at, _watermarks
+    watermarks = {}
+    suggest_index.load(_iter_catalog({}, watermarks))
+    _watermarks = watermarks
+    _built_at = time.monotonic()
+
+
+def refresh_index():
+    # Diğer workerların (veya toplu aktarımın) eklediği kayıtlar
+    global _watermarks
+    watermarks = dict(_watermarks)
+    suggest_index.add_many(_iter_catalog(_watermarks, watermarks))
+    _watermarks = watermarks
+
+
+def _maintain_index():
+    last_full = None
+    while True:
+        try:
+            full_rebuild_age = getattr(settings, 'SUGGEST_INDEX_FULL_REBUILD', 86400)
+            if last_full is None or time.monotonic() - last_full > full_rebuild_age:
+                rebuild_index()
+                last_full = time.monotonic()
+            else:
+                refresh_index()
+        except Exception:
+            logger.exception("Arama önerisi indeksi güncellenemedi")
+        finally:
+            close_old_connections()
+        time.sleep(getattr(settings, 'SUGGEST_INDEX_MAX_AGE', 600))
+
+
+def start_suggest_index():
+    global _maintainer
+    if _maintainer is None:
+        with _maintainer_lock:
+            if _maintainer is None:
+                _maintainer = threading.Thread(target=_maintain_index, daemon=True, name='suggest-index')
+                _maintainer.start()
+
+
+def get_suggest_index():
+    # İndeks kurulana kadar (süreç başında birkaç saniye) öneri listesi boş döner
+    start_suggest_index()
+    return suggest_index
+
+
+def index_item(item_id, item):
+    # Signal'lerden çağrılır; indeks henüz kurulmadıysa bir şey yapmaya gerek yok
+    if _built_at is not None:
+        suggest_index.add(item_id, item)
+
+
+def unindex_item(item_id):
+    if _built_at is not None:
+        suggest_index.remove(item_id)
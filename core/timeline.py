@@ -0,0 +1,140 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Activity, Profile, TimelineEntry
+from .realtime import actor_channel, publish, publish_to_users
+
+CELEBRITY_CACHE_KEY = 'timeline:celebrity_ids'
+# Kullanıcının zaman tüneline son yazma zamanı (ns); yoklama istekleri
+# Activity tablosuna gitmeden buna bakar (bkz. FeedViewSet.since)
+LAST_WRITE_KEY = 'timeline:last_write:{}'
+# Fan-out yapılmayan (çok takipçili) hesapların son aktivite zamanı
+ACTOR_WRITE_KEY = 'timeline:actor_write:{}'
+
+
+def get_celebrity_ids():
+    """
+    Takipçi sayısı TIMELINE_FANOUT_LIMIT'i aşan kullanıcılar. Bunların
+    aktiviteleri takipçilere dağıtılmaz, okuma sırasında eklenir
+    (fan-out-on-read). Yazma ve okuma aynı önbelleklenmiş kümeyi kullanır.
+    """
+    ids = cache.get(CELEBRITY_CACHE_KEY)
+    if ids is None:
+        limit = getattr(settings, 'TIMELINE_FANOUT_LIMIT', 5000)
+        ids = set(
+            Profile.objects.annotate(follower_total=Count('followers'))
+            .filter(follower_total__gt=limit)
+            .values_list('user_id', flat=True)
+        )
+        cache.set(CELEBRITY_CACHE_KEY, ids, 600)
+    return ids
+
+
+def followed_celebrity_ids(user):
+    # Kullanıcının takip ettiği, fan-out yapılmayan hesaplar
+    celebrity_ids = get_celebrity_ids()
+    if not celebrity_ids:
+        return []
+    return list(
+        Profile.objects.filter(followers__user=user, user_id__in=celebrity_ids).values_list('user_id', flat=True)
+    )
+
+
+def mark_timelines_written(owner_ids):
+    now = time.time_ns()
+    cache.set_many({LAST_WRITE_KEY.format(owner_id): now for owner_id in owner_ids}, None)
+
+
+def _mark_actor_written(user_id):
+    cache.set(ACTOR_WRITE_KEY.format(user_id), time.time_ns(), None)
+
+
+def timeline_last_write(user):
+    """
+    Kullanıcının akışının en son değiştiği an (ns). Takip edilen çok takipçili
+    hesapların son aktiviteleri de hesaba katılır. Kayıt önbellekten düşmüşse
+    "şimdi" kabul edilir; istemci bir kez tam cevap alır.
+    """
+    key = LAST_WRITE_KEY.format(user.pk)
+    cache.add(key, time.time_ns(), None)
+    marker = cache.get(key) or time.time_ns()
+
+    followed = followed_celebrity_ids(user)
+    if followed:
+        actor_writes = cache.get_many([ACTOR_WRITE_KEY.format(user_id) for user_id in followed])
+        marker = max([marker, *actor_writes.values()])
+    return marker
+
+
+def _entries_for(owner_ids, activities):
+    return [
+        TimelineEntry(owner_id=owner_id, activity_id=activity.id, actor_id=activity.user_id, created_at=activity.created_at)
+        for owner_id in owner_ids
+        for activity in activities
+    ]
+
+
+def fan_out_activity(activity):
+    # Yeni aktiviteyi yazanın tüm takipçilerinin zaman tüneline ekle
+    event = {'type': 'timeline', 'activity_id': activity.id, 'user_id': activity.user_id}
+    if activity.user_id in get_celebrity_ids():
+        _mark_actor_written(activity.user_id)
+        publish(actor_channel(activity.user_id), event)
+        return
+    follower_ids = list(Profile.objects.filter(following__user_id=activity.user_id).values_list('user_id', flat=True))
+    TimelineEntry.objects.bulk_create(
+        _entries_for(follower_ids, [activity]), batch_size=1000, ignore_conflicts=True
+    )
+    mark_timelines_written(follower_ids)
+    # Bağlı takipçilere anlık bildirim (core/realtime.py)
+    publish_to_users(follower_ids, event)
+
+
+def touch_activity(activity):
+    # Aktivitenin tarihi güncellendiğinde (ör. puan değişikliği) tünel sırası da güncellenir
+    entries = TimelineEntry.objects.filter(activity=activity)
+    if activity.user_id in get_celebrity_ids():
+        _mark_actor_written(activity.user_id)
+    else:
+        mark_timelines_written(list(entries.values_list('owner_id', flat=True)))
+    entries.update(created_at=activity.created_at)
+
+
+def backfill_timeline(owner_id, followed_user_id):
+    # Yeni takip edilen kullanıcının son aktivitelerini tünele ekle
+    if followed_user_id in get_celebrity_ids():
+        # Aktiviteleri okuma sırasında eklenir, yine de akış değişmiş sayılır
+        mark_timelines_written([owner_id])
+        return
+    backfill = getattr(settings, 'TIMELINE_BACKFILL_SIZE', 200)
+    recent = Activity.objects.filter(user_id=followed_user_id).only('id', 'user_id', 'created_at').order_by('-created_at')[:backfill]
+    TimelineEntry.objects.bulk_create(
+        _entries_for([owner_id], recent), batch_size=1000, ignore_conflicts=True
+    )
+    mark_timelines_written([owner_id])
+
+
+def purge_timeline(owner_id, unfollowed_user_id):
+    TimelineEntry.objects.filter(owner_id=owner_id, actor_id=unfollowed_user_id).delete()
+    mark_timelines_written([owner_id])
+
+
+def timeline_queryset(user):
+    """
+    Kullanıcının ana sayfa akışı. Normalde (owner, created_at) indeksinde
+    aralık taraması; çok takipçili hesapları takip ediyorsa onların
+    aktiviteleri okuma sırasında birleştirilir.
+    """
+    followed_celebrities = followed_celebrity_ids(user)
+    if followed_celebrities:
+        entry_ids = TimelineEntry.objects.filter(owner=user).values('activity_id')
+        return Activity.objects.filter(
+            Q(id__in=entry_ids) | Q(user_id__in=followed_celebrities)
+        ).order_by('-created_at', '-id')
+
+    return Activity.objects.filter(timeline_entries__owner=user).order_by(
+        '-timeline_entries__created_at', '-timeline_entries__activity_id'
+    )
@@ -0,0 +1,195 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+
+from .caching import SingleFlight
+
+# Cache anahtarına girmeyecek parametreler (API anahtarları)
+IGNORED_CACHE_PARAMS = {'api_key', 'key'}
+
+
+class TTLCache:
+    """Boyutu (LRU) ve ömrü (TTL) sınırlı, thread-safe bellek içi önbellek."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, count=True):
+        # (bulundu_mu, değer) döner; süresi dolan kayıt silinir
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += count
+                    return True, value
+                del self._data[key]
+            self.misses += count
+            return False, None
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+response_cache = TTLCache(
+    maxsize=getattr(settings, 'UPSTREAM_CACHE_MAXSIZE', 1024),
+    ttl=getattr(settings, 'UPSTREAM_CACHE_TTL', 300),
+)
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url):
+    # Her host için keep-alive bağlantı havuzu olan tek bir Session
+    host = urlsplit(url).netloc
+    session = _sessions.get(host)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(host)
+            if session is None:
+                pool_size = getattr(settings, 'UPSTREAM_POOL_MAXSIZE', 20)
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                session = requests.Session()
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _sessions[host] = session
+    return session
+
+
+def make_cache_key(url, params=None):
+    # Parametre sırası ve API anahtarından bağımsız anahtar
+    items = sorted(
+        (str(k), str(v)) for k, v in (params or {}).items()
+        if k not in IGNORED_CACHE_PARAMS and v is not None
+    )
+    return (url, tuple(items))
+
+
+_flight = SingleFlight()
+shared_coalesced = 0
+
+
+def _fetch_content(url, params, timeout):
+    if timeout is None:
+        timeout = getattr(settings, 'UPSTREAM_TIMEOUT', 10)
+    response = get_session(url).get(url, params=params, timeout=timeout)
+    if response.status_code != 200:
+        return None
+    return response.content
+
+
+def _fetch_shared(key, fetch, ttl):
+    # Workerlar arası kilit: aynı anahtarı sadece bir worker çeker,
+    # diğerleri sonucu paylaşılan önbellekte bekler.
+    global shared_coalesced
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()
+    result_key = f"upstream:result:{digest}"
+    lock_key = f"upstream:lock:{digest}"
+    lock_timeout = getattr(settings, 'UPSTREAM_TIMEOUT', 10)
+
+    content = cache.get(result_key)
+    if content is not None:
+        shared_coalesced += 1
+        return content
+
+    if cache.add(lock_key, 1, timeout=lock_timeout):
+        try:
+            content = fetch()
+            if content is not None:
+                cache.set(result_key, content, ttl if ttl is not None else response_cache.ttl)
+            return content
+        finally:
+            cache.delete(lock_key)
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        content = cache.get(result_key)
+        if content is not None:
+            shared_coalesced += 1
+            return content
+        if cache.get(lock_key) is None:
+            break
+    # Diğer worker başarısız olduysa kendimiz çekeriz
+    return fetch()
+
+
+def get_json(url, params=None, timeout=None, ttl=None):
+    """
+    Upstream'e GET isteği atar, 200 dönen cevabın JSON'unu döner.
+    Başarılı cevaplar önbelleğe alınır; diğer durumlarda None döner.
+    Aynı anahtar için eşzamanlı çağrılar tek bir isteği bekler.
+    Bağlantı hataları çağırana iletilir (requests.RequestException).
+    """
+    key = make_cache_key(url, params)
+    found, content = response_cache.get(key)
+    if not found:
+        def load():
+            # Bekleyen çağrı sırasında başka bir thread önbelleği doldurmuş olabilir
+            found, content = response_cache.get(key, count=False)
+            if found:
+                return content
+            fetch = lambda: _fetch_content(url, params, timeout)
+            if getattr(settings, 'UPSTREAM_SHARED_LOCK', False):
+                content = _fetch_shared(key, fetch, ttl)
+            else:
+                content = fetch()
+            if content is not None:
+                response_cache.set(key, content, ttl)
+            return content
+
+        content = _flight.do(key, load)
+        if content is None:
+            return None
+    # Çağıranlar sonucu değiştirebildiği için her seferinde yeni kopya
+    return json.loads(content)
+
+
+def cache_stats():
+    stats = response_cache.stats()
+    flight = _flight.stats()
+    stats['coalesced'] = flight['coalesced']
+    stats['in_flight'] = flight['in_flight']
+    stats['shared_coalesced'] = shared_coalesced
+    return stats
+
+
+def clear_cache():
+    response_cache.clear()
@@ -5,13 +5,13 @@ from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 from rest_framework.routers import DefaultRouter
 from core.views import (
-    MovieViewSet, BookViewSet, FeedViewSet, SearchView, 
+    MovieViewSet, BookViewSet, FeedViewSet, SearchView, SuggestView, 
     index, register_view, login_view, logout_view, movie_detail, 
     profile_view, edit_profile_view, MovieInteractionView, book_detail, follow_user,
     create_custom_list, list_detail, remove_follower,
     add_rating, add_review, delete_review, edit_review,
     like_activity, add_activity_comment, share_activity,
-    movies_page, books_page, members_page, search_page, explore, filter_content, notifications_page,
+    movies_page, books_page, members_page, search_page, explore, filter_content, notifications_page, events,
     tv_series_page, tv_series_detail, lists_page, like_list, add_item_to_list, remove_item_from_list
 )
 
@@ -72,10 +72,12 @@ urlpatterns = [
 
     # Bildirimler
     path('notifications/', notifications_page, name='notifications_page'),
+    path('events/', events, name='events'),
 
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/search/', SearchView.as_view(), name='search'),
+    path('api/search/suggest/', SuggestView.as_view(), name='search_suggest'),
 ] 
 
 if settings.DEBUG:
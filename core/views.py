@@ -1,15 +1,22 @@
+import hashlib
+
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Avg, Count
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from rest_framework import viewsets, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.decorators import action
 from .models import Movie, Book, Activity, UserList, Profile, Rating, Review, ActivityLike, ActivityComment, TVSeries
 from .serializers import MovieSerializer, BookSerializer, ActivitySerializer
 from .services import (
@@ -17,9 +24,20 @@ from .services import (
     get_popular_movies, get_top_rated_movies, get_movie_genres, get_movies_by_genre,
     get_books_by_category, discover_movies,
     get_popular_tv_series, get_top_rated_tv_series, get_tv_series_detail_service,
-    get_tv_genres, get_tv_series_by_genre
+    get_tv_genres, get_tv_series_by_genre,
+    get_movie_detail_snapshot, get_tv_series_detail_snapshot, get_book_detail_snapshot
 )
 from .forms import ProfileUpdateForm
+from .caching import get_or_refresh
+from .suggest import get_suggest_index
+from .timeline import timeline_queryset, timeline_last_write, followed_celebrity_ids
+from .realtime import event_stream, user_channel, actor_channel
+from .rankings import top_rated
+from .members import leaderboard, popular_activities
+from .lists import LIST_PREVIEW_SIZE, LISTS_PAGE_SIZE, liked_list_ids
+from .notifications import NOTIFICATIONS_PAGE_SIZE, reset_unread_summary
+from asgiref.sync import sync_to_async
+from .feed import feed_queryset, paginate_by_cursor, newer_than_cursor, attach_card_fragments, FeedCursorPagination
 
 # --- API VIEWSETS ---
 class MovieViewSet(viewsets.ModelViewSet):
@@ -33,10 +51,65 @@ class BookViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 class FeedViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Mobil akış API'si.
+    ?scope=following (varsayılan, zaman tüneli) | global | user (&username=...)
+    ?cursor=... imleç sayfalama, ?fields=id,user,movie.title seyrek alan seçimi
+    """
     serializer_class = ActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedCursorPagination
+    # ActivitySerializer'ın eriştiği tüm ilişkiler tek sorguda
+    select_related_fields = ('user', 'user__profile', 'movie', 'book', 'related_rating', 'related_review')
+
     def get_queryset(self):
-        return Activity.objects.all().order_by('-created_at')
+        scope = self.request.query_params.get('scope', 'following')
+        if self.action == 'retrieve' or scope == 'global':
+            queryset = Activity.objects.order_by('-created_at', '-id')
+        elif scope == 'following':
+            queryset = timeline_queryset(self.request.user)
+        elif scope == 'user':
+            username = self.request.query_params.get('username')
+            if not username:
+                raise ValidationError({'username': "scope=user için kullanıcı adı gerekli."})
+            queryset = Activity.objects.filter(user__username=username).order_by('-created_at', '-id')
+        else:
+            raise ValidationError({'scope': "Geçersiz kapsam. following, global veya user olmalı."})
+        return queryset.select_related(*self.select_related_fields)
+
+    @action(detail=False)
+    def since(self, request):
+        """
+        Yoklama için: ?cursor=<görülen en yeni imleç> sonrasındaki aktiviteler.
+        ETag, kullanıcının zaman tüneli son yazma işaretinden (ns) ve isteğin
+        imleç/alan parametrelerinden üretilir; değişiklik yoksa Activity
+        tablosuna gitmeden 304 döner. Saniye çözünürlüklü Last-Modified
+        kullanılmaz (aynı saniyedeki yeni aktiviteler kaçırılırdı).
+        """
+        marker = timeline_last_write(request.user)
+        variant = hashlib.sha1(
+            f"{request.query_params.get('cursor', '')}|{request.query_params.get('fields', '')}".encode()
+        ).hexdigest()[:16]
+        etag = f'"{request.user.pk}-{marker}-{variant}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        queryset = timeline_queryset(request.user).select_related(*self.select_related_fields)
+        items, count, cursor = newer_than_cursor(queryset, request.query_params.get('cursor'))
+        response = Response({
+            'results': self.get_serializer(items, many=True).data,
+            'count': count,
+            'cursor': cursor,
+        })
+        response['ETag'] = etag
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.request.query_params.get('fields')
+        if fields:
+            kwargs['fields'] = fields.split(',')
+        return super().get_serializer(*args, **kwargs)
 
 class SearchView(APIView):
     def get(self, request):
@@ -112,12 +185,27 @@ class SearchView(APIView):
             'movies': [r for r in formatted_results if r['type'] == 'movie'],
             'tv_series': [r for r in formatted_results if r['type'] == 'tv'],
             'books': [r for r in formatted_results if r['type'] == 'book'],
-            'users': [r for r in formatted_results if r['type'] == 'user']
+            'users': [r for r in formatted_results if r['type'] == 'user'],
+            # Süre aşımına uğrayan veya hata veren kaynaklar (kısmi sonuç)
+            'partial': raw_results.get('partial', False),
+            'timed_out': raw_results.get('timed_out', []),
+            'failed': raw_results.get('failed', [])
         }
 
         return Response(response_data)
 
-from django.core.paginator import Paginator
+class SuggestView(APIView):
+    # Arama kutusu önerileri: bellek içi önek indeksinden, veritabanına gitmeden
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 8)), 20))
+        except ValueError:
+            limit = 8
+        return Response({'results': get_suggest_index().search(query, limit)})
 
 def get_platform_popular_movies():
     # Platformda en çok etkileşim alan filmler
@@ -137,25 +225,16 @@ def get_platform_popular_movies():
     return results
 
 def get_platform_top_rated_movies():
-    # Platformda en yüksek puanlı filmler
-    top_rated = Rating.objects.filter(movie__isnull=False).values('movie').annotate(
-        avg_score=Avg('score'),
-        count=Count('id')
-    ).filter(count__gte=1).order_by('-avg_score')[:6]
-    
+    # Platformda en yüksek puanlı filmler (Bayes ortalamalı sıralama görüntüsünden)
     results = []
-    for item in top_rated:
-        try:
-            movie = Movie.objects.get(id=item['movie'])
-            results.append({
-                'id': movie.tmdb_id,
-                'title': movie.title,
-                'image': f"https://image.tmdb.org/t/p/w500{movie.poster_path}" if movie.poster_path else None,
-                'subtitle': f"{item['avg_score']:.1f} Puan",
-                'vote_average': item['avg_score']
-            })
-        except Movie.DoesNotExist:
-            continue
+    for movie in top_rated('movie', limit=6):
+        results.append({
+            'id': movie.tmdb_id,
+            'title': movie.title,
+            'image': f"https://image.tmdb.org/t/p/w500{movie.poster_path}" if movie.poster_path else None,
+            'subtitle': f"{movie.rating_avg:.1f} Puan",
+            'vote_average': movie.rating_avg
+        })
     return results
 
 def get_platform_popular_books():
@@ -175,63 +254,49 @@ def get_platform_popular_books():
         })
     return results
 
+def get_explore_showcase():
+    # Keşfet vitrini: her blok ayrı anahtarla stale-while-revalidate önbellekte tutulur
+    showcase_blocks = {
+        'platform_popular_movies': get_platform_popular_movies,
+        'platform_top_rated_movies': get_platform_top_rated_movies,
+        'platform_popular_books': get_platform_popular_books,
+        'api_popular_movies': lambda: get_popular_movies()[:6],
+        'api_top_rated_movies': lambda: get_top_rated_movies()[:6],
+        'api_popular_books': lambda: get_books_by_category("subject:fiction")[:6],
+        'genres': get_movie_genres,
+    }
+    return {name: get_or_refresh(f"explore:{name}", fetch) for name, fetch in showcase_blocks.items()}
+
 # --- FRONTEND VIEWS ---
 def explore(request):
     # Keşfet Sayfası: Takip edilen/edilmeyen herkesin aktiviteleri
     if request.user.is_authenticated:
-        activity_list = Activity.objects.exclude(user=request.user).select_related('user', 'user__profile', 'movie', 'book').order_by('-created_at')
+        activity_list = Activity.objects.exclude(user=request.user).order_by('-created_at', '-id')
     else:
-        activity_list = Activity.objects.select_related('user', 'user__profile', 'movie', 'book').all().order_by('-created_at')
+        activity_list = Activity.objects.all().order_by('-created_at', '-id')
+    # Sayaçlar ve ilişkiler toplu olarak yüklenir (core/feed.py)
+    activity_list = feed_queryset(activity_list, request.user)
     
-    paginator = Paginator(activity_list, 10) 
-    page_number = request.GET.get('page')
-    activities = paginator.get_page(page_number)
-
-    for activity in activities:
-        activity.like_count = activity.likes.count()
-        activity.comment_list = activity.comments.select_related('user', 'user__profile').order_by('created_at')
-        if request.user.is_authenticated:
-            activity.is_liked = activity.likes.filter(user=request.user).exists()
-            
-            target_id = activity.original_activity.id if activity.action_type == 'SHARED' else activity.id
-            activity.is_shared = Activity.objects.filter(
-                user=request.user, 
-                action_type='SHARED', 
-                original_activity_id=target_id
-            ).exists()
+    # İmleç sayfalama: COUNT(*) ve OFFSET yerine son görülen (tarih, id)
+    activities, next_cursor = paginate_by_cursor(activity_list, request.GET.get('cursor'))
+    activities = attach_card_fragments(activities)
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        html = ""
-        for activity in activities:
-            html += render_to_string('partials/activity_card.html', {'activity': activity, 'user': request.user}, request=request)
+        # Kartlar tek seferde render edilir (context processor'lar bir kez çalışır)
+        html = render_to_string('partials/activity_cards.html', {'activities': activities, 'user': request.user}, request=request)
         
         return JsonResponse({
             'html': html,
-            'has_next': activities.has_next(),
-            'next_page_number': activities.next_page_number() if activities.has_next() else None
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
         })
     
-    # Vitrin Verileri
-    platform_popular_movies = get_platform_popular_movies()
-    platform_top_rated_movies = get_platform_top_rated_movies()
-    platform_popular_books = get_platform_popular_books()
-    
-    api_popular_movies = get_popular_movies()[:6]
-    api_top_rated_movies = get_top_rated_movies()[:6]
-    api_popular_books = get_books_by_category("subject:fiction")[:6]
-    
-    genres = get_movie_genres()
-            
+    # Vitrin Verileri (önbellekten)
     context = {
         'activities': activities, 
+        'next_cursor': next_cursor,
         'page_title': 'Keşfet',
-        'platform_popular_movies': platform_popular_movies,
-        'platform_top_rated_movies': platform_top_rated_movies,
-        'platform_popular_books': platform_popular_books,
-        'api_popular_movies': api_popular_movies,
-        'api_top_rated_movies': api_top_rated_movies,
-        'api_popular_books': api_popular_books,
-        'genres': genres
+        **get_explore_showcase()
     }
     return render(request, 'explore.html', context)
 
@@ -254,61 +319,50 @@ def filter_content(request):
 
 def index(request):
     if request.user.is_authenticated:
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        following_profiles = profile.following.all()
-        following_users = [p.user for p in following_profiles]
-        
-        activity_list = Activity.objects.filter(user__in=following_users).select_related('user', 'user__profile', 'movie', 'book').order_by('-created_at')
+        Profile.objects.get_or_create(user=request.user)
+        # Materyalize zaman tüneli (core/timeline.py)
+        activity_list = feed_queryset(timeline_queryset(request.user), request.user)
     else:
         # Giriş yapmamışsa aktivite gösterme (Landing Page)
-        activity_list = Activity.objects.none()
+        activity_list = Activity.objects.none().order_by('-created_at', '-id')
     
-    paginator = Paginator(activity_list, 10) 
-    page_number = request.GET.get('page')
-    activities = paginator.get_page(page_number)
-
-    for activity in activities:
-        activity.like_count = activity.likes.count()
-        activity.comment_list = activity.comments.select_related('user', 'user__profile').order_by('created_at')
-        if request.user.is_authenticated:
-            activity.is_liked = activity.likes.filter(user=request.user).exists()
-            
-            target_id = activity.original_activity.id if activity.action_type == 'SHARED' else activity.id
-            activity.is_shared = Activity.objects.filter(
-                user=request.user, 
-                action_type='SHARED', 
-                original_activity_id=target_id
-            ).exists()
+    # İmleç sayfalama: COUNT(*) ve OFFSET yerine son görülen (tarih, id)
+    activities, next_cursor = paginate_by_cursor(activity_list, request.GET.get('cursor'))
+    activities = attach_card_fragments(activities)
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        html = ""
-        for activity in activities:
-            html += render_to_string('partials/activity_card.html', {'activity': activity, 'user': request.user}, request=request)
+        # Kartlar tek seferde render edilir (context processor'lar bir kez çalışır)
+        html = render_to_string('partials/activity_cards.html', {'activities': activities, 'user': request.user}, request=request)
         
         return JsonResponse({
             'html': html,
-            'has_next': activities.has_next(),
-            'next_page_number': activities.next_page_number() if activities.has_next() else None
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
         })
         
-    return render(request, 'index.html', {'activities': activities, 'page_title': 'Zaman Tüneli'})
+    return render(request, 'index.html', {'activities': activities, 'next_cursor': next_cursor, 'page_title': 'Zaman Tüneli'})
 
 def movie_detail(request, tmdb_id):
-    movie_data = get_movie_detail_service(tmdb_id)
+    # Yerel kopya varsa TMDB'ye gidilmez
+    movie_data, local_movie = get_movie_detail_snapshot(tmdb_id)
     if not movie_data: return render(request, '404.html')
     
     context = {'movie': movie_data}
     
     # Platform İstatistikleri ve Yorumlar
-    try:
-        local_movie = Movie.objects.get(tmdb_id=tmdb_id)
-        platform_stats = Rating.objects.filter(movie=local_movie).aggregate(avg_score=Avg('score'), total_votes=Count('id'))
+    if local_movie:
+        # İçerik üzerinde tutulan puan özetinden (core/ratings.py)
+        platform_stats = {
+            'avg_score': local_movie.rating_avg,
+            'total_votes': local_movie.rating_count,
+            'histogram': local_movie.rating_histogram,
+        }
         reviews = Review.objects.filter(movie=local_movie).select_related('user', 'user__profile').order_by('-created_at')
         
         if request.user.is_authenticated:
             user_rating = Rating.objects.filter(user=request.user, movie=local_movie).first()
             context['user_rating'] = user_rating
-    except Movie.DoesNotExist:
+    else:
         platform_stats = {'avg_score': None, 'total_votes': 0}
         reviews = []
         
@@ -317,11 +371,10 @@ def movie_detail(request, tmdb_id):
     
     if request.user.is_authenticated:
         user_lists = UserList.objects.filter(user=request.user)
-        try:
-            movie_obj = Movie.objects.get(tmdb_id=tmdb_id)
-            lists_containing_movie = user_lists.filter(movies=movie_obj).values_list('id', flat=True)
-            standard_lists_containing = user_lists.filter(movies=movie_obj).exclude(list_type='custom').values_list('list_type', flat=True)
-        except Movie.DoesNotExist:
+        if local_movie:
+            lists_containing_movie = user_lists.filter(movies=local_movie).values_list('id', flat=True)
+            standard_lists_containing = user_lists.filter(movies=local_movie).exclude(list_type='custom').values_list('list_type', flat=True)
+        else:
             lists_containing_movie = []
             standard_lists_containing = []
             
@@ -332,7 +385,8 @@ def movie_detail(request, tmdb_id):
     return render(request, 'movie_detail.html', context)
 
 def book_detail(request, google_id):
-    book_data = get_book_detail_service(google_id)
+    # Yerel kopya varsa Google Books'a gidilmez
+    book_data, local_book = get_book_detail_snapshot(google_id)
     if not book_data: return render(request, '404.html')
     
     info = book_data.get('volumeInfo', {})
@@ -357,15 +411,19 @@ def book_detail(request, google_id):
     }
 
     # Platform İstatistikleri ve Yorumlar
-    try:
-        local_book = Book.objects.get(google_id=google_id)
-        platform_stats = Rating.objects.filter(book=local_book).aggregate(avg_score=Avg('score'), total_votes=Count('id'))
+    if local_book:
+        # İçerik üzerinde tutulan puan özetinden (core/ratings.py)
+        platform_stats = {
+            'avg_score': local_book.rating_avg,
+            'total_votes': local_book.rating_count,
+            'histogram': local_book.rating_histogram,
+        }
         reviews = Review.objects.filter(book=local_book).select_related('user', 'user__profile').order_by('-created_at')
         
         if request.user.is_authenticated:
             user_rating = Rating.objects.filter(user=request.user, book=local_book).first()
             context['user_rating'] = user_rating
-    except Book.DoesNotExist:
+    else:
         platform_stats = {'avg_score': None, 'total_votes': 0}
         reviews = []
         
@@ -374,11 +432,10 @@ def book_detail(request, google_id):
 
     if request.user.is_authenticated:
         user_lists = UserList.objects.filter(user=request.user)
-        try:
-            book_obj = Book.objects.get(google_id=google_id)
-            lists_containing_book = user_lists.filter(books=book_obj).values_list('id', flat=True)
-            standard_lists_containing = user_lists.filter(books=book_obj).exclude(list_type='custom').values_list('list_type', flat=True)
-        except Book.DoesNotExist:
+        if local_book:
+            lists_containing_book = user_lists.filter(books=local_book).values_list('id', flat=True)
+            standard_lists_containing = user_lists.filter(books=local_book).exclude(list_type='custom').values_list('list_type', flat=True)
+        else:
             lists_containing_book = []
             standard_lists_containing = []
             
@@ -871,7 +928,9 @@ def like_activity(request, activity_id):
         liked = True
         
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({'status': 'liked' if liked else 'unliked', 'like_count': activity.likes.count()})
+        # Sayaç signal'de atomik olarak güncellendi
+        activity.refresh_from_db(fields=['like_count'])
+        return JsonResponse({'status': 'liked' if liked else 'unliked', 'like_count': activity.like_count})
     
     return redirect(request.META.get('HTTP_REFERER', 'home'))
 
@@ -940,10 +999,7 @@ def movies_page(request):
         title = "Popüler Filmler"
         
     # Local Top Rated
-    local_top_movies = Movie.objects.annotate(
-        avg_rating=Avg('rating__score'), 
-        count=Count('rating')
-    ).filter(count__gt=0).order_by('-avg_rating')[:5]
+    local_top_movies = top_rated('movie', genre_id or '', 5)
 
     context = {
         'movies': movies,
@@ -966,10 +1022,7 @@ def tv_series_page(request):
         title = "Popüler Diziler"
     
     # Local Top Rated TV Series
-    local_top_series = TVSeries.objects.annotate(
-        avg_rating=Avg('rating__score'), 
-        count=Count('rating')
-    ).filter(count__gt=0).order_by('-avg_rating')[:5]
+    local_top_series = top_rated('tv', genre_id or '', 5)
 
     context = {
         'tv_series': tv_series,
@@ -981,11 +1034,10 @@ def tv_series_page(request):
     return render(request, 'tv_series.html', context)
 
 def tv_series_detail(request, tmdb_id):
-    tv_data = get_tv_series_detail_service(tmdb_id)
+    # Yerel kopya varsa TMDB'ye gidilmez
+    tv_data, tv_obj = get_tv_series_detail_snapshot(tmdb_id)
     if not tv_data:
         return redirect('index')
-
-    tv_obj = TVSeries.objects.filter(tmdb_id=tmdb_id).first()
     
     reviews = []
     user_rating = None
@@ -998,9 +1050,8 @@ def tv_series_detail(request, tmdb_id):
             if rating_obj:
                 user_rating = rating_obj.score
         
-        local_avg = Rating.objects.filter(tv_series=tv_obj).aggregate(Avg('score'))['score__avg']
-        if local_avg:
-            avg_rating = local_avg
+        if tv_obj.rating_avg:
+            avg_rating = tv_obj.rating_avg
 
     context = {
         'tv': tv_data,
@@ -1048,11 +1099,9 @@ def books_page(request):
         {'id': 'biography', 'name': 'Biyografi'},
     ]
     
-    # Local Top Rated
-    local_top_books = Book.objects.annotate(
-        avg_rating=Avg('rating__score'),
-        count=Count('rating')
-    ).filter(count__gt=0).order_by('-avg_rating')[:5]
+    # Local Top Rated: sıralama anahtarı Google Books kategori adıdır (küçük harf)
+    ranking_genre = search_query.replace('subject:', '').strip('"').lower()
+    local_top_books = top_rated('book', ranking_genre, 5) or top_rated('book', limit=5)
 
     context = {
         'books': books,
@@ -1063,67 +1112,11 @@ def books_page(request):
     return render(request, 'books.html', context)
 
 def members_page(request):
-    active_users = User.objects.filter(is_superuser=False).annotate(activity_count=Count('activities')).order_by('-activity_count')[:12]
-    
-    for user in active_users:
-        user.movie_count = Activity.objects.filter(user=user, movie__isnull=False).count()
-        user.book_count = Activity.objects.filter(user=user, book__isnull=False).count()
-        user.review_count = Activity.objects.filter(user=user, action_type='REVIEWED').count()
-        
-        recent_activities = Activity.objects.filter(user=user).select_related('movie', 'book').order_by('-created_at')
-        
-        recent_items = []
-        seen_ids = set()
-        
-        for activity in recent_activities:
-            if len(recent_items) >= 4:
-                break
-                
-            item_data = None
-            unique_key = None
-            
-            if activity.movie:
-                unique_key = f"movie_{activity.movie.id}"
-                if unique_key not in seen_ids:
-                    item_data = {
-                        'type': 'movie',
-                        'image': f"https://image.tmdb.org/t/p/w92{activity.movie.poster_path}",
-                        'title': activity.movie.title
-                    }
-            elif activity.book:
-                unique_key = f"book_{activity.book.id}"
-                if unique_key not in seen_ids:
-                    item_data = {
-                        'type': 'book',
-                        'image': activity.book.cover_path,
-                        'title': activity.book.title
-                    }
-            
-            if item_data:
-                seen_ids.add(unique_key)
-                recent_items.append(item_data)
-        
-        user.recent_items = recent_items
-
-    popular_reviews = Activity.objects.filter(action_type='REVIEWED', user__is_superuser=False) \
-        .exclude(related_review__isnull=True) \
-        .exclude(related_review__text='') \
-        .annotate(like_count=Count('likes')) \
-        .order_by('-like_count')[:6]
-    
-    popular_activities = Activity.objects.filter(user__is_superuser=False).annotate(like_count=Count('likes')).filter(like_count__gt=0).order_by('-like_count')[:6]
-
-    if request.user.is_authenticated:
-        for activity in popular_reviews:
-            activity.is_liked = activity.likes.filter(user=request.user).exists()
-        
-        for activity in popular_activities:
-            activity.is_liked = activity.likes.filter(user=request.user).exists()
-
+    # Özet tablosundan ve önbelleklenmiş sıralamalardan (core/members.py)
     context = {
-        'active_users': active_users,
-        'popular_reviews': popular_reviews,
-        'popular_activities': popular_activities
+        'active_users': leaderboard(12),
+        'popular_reviews': popular_activities('reviews', request.user),
+        'popular_activities': popular_activities('activities', request.user)
     }
     return render(request, 'members.html', context)
 
@@ -1137,50 +1130,51 @@ def search_page(request):
         
     return render(request, 'search_results.html', {'query': query, 'results': results})
 
+async def events(request):
+    """
+    Anlık bildirim ve zaman tüneli olayları (Server-Sent Events).
+    Uzun süre açık kalan bağlantılar için ASGI ile servis edilmelidir;
+    REALTIME_ENABLED kapalıyken (WSGI) 204 döner, EventSource yeniden bağlanmaz.
+    """
+    if not getattr(settings, 'REALTIME_ENABLED', False):
+        return HttpResponse(status=204)
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    celebrity_ids = await sync_to_async(followed_celebrity_ids)(user)
+    channels = [user_channel(user.pk)] + [actor_channel(user_id) for user_id in celebrity_ids]
+
+    response = StreamingHttpResponse(event_stream(channels), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Nginx gibi proxy'lerin akışı tamponlamaması için
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def notifications_page(request):
-    notifications = request.user.notifications.all().select_related('sender', 'sender__profile', 'activity')
+    notifications = request.user.notifications.select_related('sender', 'sender__profile').order_by('-created_at', '-id')
     
-    # Template'de "Yeni" ibaresini göstermek için önce listeyi alıyoruz
-    notifications_list = list(notifications)
+    # Template'de "Yeni" ibaresini göstermek için önce sayfayı alıyoruz
+    notifications_list, next_cursor = paginate_by_cursor(notifications, request.GET.get('cursor'), NOTIFICATIONS_PAGE_SIZE)
     
-    unread_notifications = request.user.notifications.filter(is_read=False)
-    if unread_notifications.exists():
-        unread_notifications.update(is_read=True)
+    # (recipient, is_read, created_at) indeksiyle; okunmamış yoksa satır taranmaz
+    request.user.notifications.filter(is_read=False).update(is_read=True)
+    reset_unread_summary(request.user.pk)
         
-    return render(request, 'notifications.html', {'notifications': notifications_list})
+    return render(request, 'notifications.html', {'notifications': notifications_list, 'next_cursor': next_cursor})
 
 def lists_page(request):
-    lists = UserList.objects.filter(list_type='custom').annotate(
-        like_count=Count('likes')
-    ).order_by('-like_count')
-    
+    # Kapaklar ve beğeni sayısı listede saklanır (core/lists.py); sayfa başına
+    # bir liste sorgusu ve bir "beğendim mi" sorgusu
+    lists = UserList.objects.filter(list_type='custom').select_related('user', 'user__profile').order_by('-like_count', '-id')
+    lists, next_cursor = paginate_by_cursor(lists, request.GET.get('cursor'), LISTS_PAGE_SIZE)
+
+    liked_ids = liked_list_ids(request.user, lists)
     for lst in lists:
-        preview_items = []
-        
-        for m in lst.movies.all()[:5]:
-            if m.poster_path:
-                preview_items.append(f"https://image.tmdb.org/t/p/w154{m.poster_path}")
-        
-        if len(preview_items) < 5:
-            remaining = 5 - len(preview_items)
-            for t in lst.tv_series.all()[:remaining]:
-                if t.poster_path:
-                    preview_items.append(f"https://image.tmdb.org/t/p/w154{t.poster_path}")
-                    
-        if len(preview_items) < 5:
-            remaining = 5 - len(preview_items)
-            for b in lst.books.all()[:remaining]:
-                if b.cover_path:
-                    preview_items.append(b.cover_path)
-        
-        while len(preview_items) < 5:
-            preview_items.append(None)
-                    
-        lst.preview_images = preview_items
-        lst.is_liked = request.user.is_authenticated and lst.likes.filter(id=request.user.id).exists()
+        lst.preview_images = lst.preview_images + [None] * (LIST_PREVIEW_SIZE - len(lst.preview_images))
+        lst.is_liked = lst.id in liked_ids
 
-    return render(request, 'lists.html', {'lists': lists})
+    return render(request, 'lists.html', {'lists': lists, 'next_cursor': next_cursor})
 
 @login_required
 def like_list(request, list_id):
@@ -1193,7 +1187,8 @@ def like_list(request, list_id):
         liked = True
         
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        return JsonResponse({'status': 'liked' if liked else 'unliked', 'like_count': user_list.likes.count()})
+        user_list.refresh_from_db(fields=['like_count'])
+        return JsonResponse({'status': 'liked' if liked else 'unliked', 'like_count': user_list.like_count})
         
     return redirect(request.META.get('HTTP_REFERER', 'lists_page'))
 
@@ -1221,7 +1216,9 @@ def add_item_to_list(request, list_id, item_type, item_id):
                         overview=details.get('overview', ''),
                         poster_path=details.get('poster_path', ''),
                         release_date=release_date,
-                        vote_average=details.get('vote_average', 0)
+                        vote_average=details.get('vote_average', 0),
+                        detail_payload=details,
+                        detail_updated_at=timezone.now()
                     )
             
             if movie:
@@ -1244,7 +1241,9 @@ def add_item_to_list(request, list_id, item_type, item_id):
                         overview=details.get('overview', ''),
                         poster_path=details.get('poster_path', ''),
                         first_air_date=first_air_date,
-                        vote_average=details.get('vote_average', 0)
+                        vote_average=details.get('vote_average', 0),
+                        detail_payload=details,
+                        detail_updated_at=timezone.now()
                     )
             
             if tv:
@@ -1266,7 +1265,9 @@ def add_item_to_list(request, list_id, item_type, item_id):
                         authors=authors,
                         description=info.get('description', ''),
                         cover_path=cover,
-                        page_count=info.get('pageCount', 0)
+                        page_count=info.get('pageCount', 0),
+                        detail_payload=details,
+                        detail_updated_at=timezone.now()
                     )
             
             if book:
@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# Arama önerisi indeksi ilk istek beklemeden arka planda kurulmaya başlar
+from core.suggest import start_suggest_index  # noqa: E402
+start_suggest_index()